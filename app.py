@@ -1,19 +1,34 @@
 import streamlit as st
 import json
+import copy
+import functools
 import hashlib
+import hmac
 import os
 import re
+import sys
 import datetime
 import shutil
 from pathlib import Path
 import time
 from typing import Dict, List, Optional, Tuple
 import uuid
-from collections import defaultdict
+from collections import defaultdict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
+import atexit
 import base64
 import pandas as pd
 import io
+import csv
+import mmap
+import bcrypt
+from PIL import Image, ImageOps
+
+try:
+    import orjson
+except ImportError:  # optional speedup, stdlib json is used otherwise
+    orjson = None
 
 # Constants
 USERS_FILE = "users.json"
@@ -23,10 +38,21 @@ LOG_DIR = "logs"
 BACKUP_DIR = "backups"
 MESSAGES_FILE = "messages.json"
 MAX_BACKUPS = 5
+BACKUP_INTERVAL = 60  # minimum seconds between backups of the same file
+MMAP_THRESHOLD = 64 * 1024  # JSON files larger than this are parsed from a memory map
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # bytes copied per write when saving uploads
+MAX_UPLOAD_SIZE = 200 * 1024 * 1024  # 200MB per file
+MAX_PASSWORD_BYTES = 72  # bcrypt only hashes the first 72 bytes; bcrypt 5 rejects longer input
+PASSWORD_TOO_LONG_MSG = f"รหัสผ่านยาวเกินไป (สูงสุด {MAX_PASSWORD_BYTES} ไบต์ ตัวอักษรไทยใช้ 3 ไบต์ต่อตัว)"
+UPLOAD_WORKERS = 4  # files of one submission saved in parallel
+PREVIEW_MAX_SIZE = 1024  # longest side, in pixels, of image previews
+IMG_EXTS = frozenset({'.png', '.jpg', '.jpeg', '.gif'})
+FILENAME_SAFE_TABLE = str.maketrans({' ': '-', '/': '-'})  # characters replaced in uploaded filenames
 SESSION_TIMEOUT = 24 * 60 * 60  # 24 hours in seconds
+SESSION_SWEEP_INTERVAL = 60  # seconds between expired-session sweeps
 
 # Thai provinces list
-THAI_PROVINCES = [
+THAI_PROVINCES = (
     "กรุงเทพมหานคร", "กระบี่", "กาญจนบุรี", "กาฬสินธุ์", "กำแพงเพชร", "ขอนแก่น", "จันทบุรี", "ฉะเชิงเทรา",
     "ชลบุรี", "ชัยนาท", "ชัยภูมิ", "ชุมพร", "เชียงราย", "เชียงใหม่", "ตรัง", "ตราด", "ตาก", "นครนายก",
     "นครปฐม", "นครพนม", "นครราชสีมา", "นครศรีธรรมราช", "นครสวรรค์", "นนทบุรี", "นราธิวาส", "น่าน",
@@ -36,125 +62,659 @@ THAI_PROVINCES = [
     "เลย", "ศรีสะเกษ", "สกลนคร", "สงขลา", "สตูล", "สมุทรปราการ", "สมุทรสงคราม", "สมุทรสาคร", "สระแก้ว",
     "สระบุรี", "สิงห์บุรี", "สุโขทัย", "สุพรรณบุรี", "สุราษฎร์ธานี", "สุรินทร์", "หนองคาย", "หนองบัวลำภู",
     "อ่างทอง", "อำนาจเจริญ", "อุดรธานี", "อุตรดิตถ์", "อุทัยธานี", "อุบลราชธานี"
-]
+)
 
 # Thai title prefixes
-THAI_TITLES = [
+THAI_TITLES = (
     "นาย", "นาง", "นางสาว"
-]
+)
+
+# Selectbox options with a leading blank choice, and each province's position in them
+PROVINCE_OPTIONS = ("",) + THAI_PROVINCES
+PROVINCE_OPTION_INDEX = {province: i for i, province in enumerate(PROVINCE_OPTIONS)}
+TITLE_OPTIONS = ("",) + THAI_TITLES
+
+# Thai labels for fields that must be unique across users
+DUPLICATE_FIELD_NAMES = {
+    'username': 'ชื่อผู้ใช้',
+    'email': 'อีเมล',
+    'phone': 'หมายเลขโทรศัพท์',
+    'citizen_id': 'เลขบัตรประชาชน'
+}
+
+# Selectable graduation years
+GRAD_YEARS = tuple(range(2020, 2030))
+
+# Birth date picker bounds and default
+BIRTH_DATE_MIN = datetime.date(1950, 1, 1)
+BIRTH_DATE_DEFAULT = datetime.date(2000, 1, 1)
+
+# Validation patterns, applied with fullmatch
+THAI_NAME_RE = re.compile(r'[ก-๙a-zA-Z\s]+')
+EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+PHONE_RE = re.compile(r'(?:06|08|09)[0-9]{8}')
+TEN_DIGITS_RE = re.compile(r'[0-9]{10}')
+PHONE_STRIP_RE = re.compile(r'[\s-]')
+NON_DIGIT_RE = re.compile(r'[^0-9]')
+CITIZEN_ID_RE = re.compile(r'[0-9]{13}')
+
+# Per-session UI toggles, initialized to False at the top of each run
+UI_FLAGS = ('show_forgot_password', 'password_reset_success', 'show_message_form')
 
 # Create necessary directories
 for directory in [UPLOAD_DIR, LOG_DIR, BACKUP_DIR]:
     os.makedirs(directory, exist_ok=True)
 
-# File lock for thread safety
-file_lock = threading.Lock()
+# Parsed JSON files shared across reruns and sessions: filename -> ((mtime_ns, size, inode), data)
+@st.cache_resource
+def get_json_cache() -> dict:
+    return {}
+
+# Lazily built field indexes over cached JSON files: filename -> (stamp, {field: {value: keys}})
+@st.cache_resource
+def get_index_cache() -> dict:
+    return {}
+
+@st.cache_resource
+def get_json_cache_lock() -> threading.RLock:
+    return threading.RLock()
+
+# One write lock per data file, shared across reruns and sessions
+@st.cache_resource
+def get_file_lock(filename: str) -> threading.RLock:
+    return threading.RLock()
+
+# Monotonic time of the last backup per file prefix
+@st.cache_resource
+def get_last_backup_times() -> dict:
+    return {}
+
+# Number of backups on disk per file prefix, learned on the first cleanup after startup
+@st.cache_resource
+def get_backup_counts() -> dict:
+    return {}
+
+# Worker threads for writing uploaded files, shared by all sessions
+@st.cache_resource
+def get_upload_pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=UPLOAD_WORKERS, thread_name_prefix="upload")
+
+# Monotonic time of the last expired-session sweep, guarded by its lock
+@st.cache_resource
+def get_session_sweep_state() -> dict:
+    return {'last': float('-inf'), 'lock': threading.Lock()}
 
 class DataManager:
     @staticmethod
     def load_json(filename: str, default=None):
-        """Load JSON data with error handling"""
+        """Load JSON data with error handling, returning a private copy the caller may modify"""
+        return copy.deepcopy(DataManager.load_json_readonly(filename, default))
+    
+    @staticmethod
+    def load_json_readonly(filename: str, default=None):
+        """Load JSON data shared with the cache, re-parsing only when the file changes; do not mutate the result"""
+        if default is None:
+            default = {}
+        try:
+            _, data = DataManager._load_cached(filename)
+        except FileNotFoundError:
+            return default
+        except Exception as e:
+            st.error(f"Error loading {filename}: {e}")
+            return default
+        return data
+    
+    @staticmethod
+    def _stamp(stat: os.stat_result) -> tuple:
+        """Cache validity stamp; the inode changes on every atomic replace even if mtime and size do not"""
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    
+    @staticmethod
+    def _load_cached(filename: str) -> tuple:
+        """Return the shared (stamp, data) cache entry for filename; callers must not mutate data"""
+        stat = os.stat(filename)
+        stamp = DataManager._stamp(stat)
+        cache = get_json_cache()
+        with get_json_cache_lock():
+            cached = cache.get(filename)
+            if cached and cached[0] == stamp:
+                return cached
+        
+        with open(filename, 'rb') as f:
+            mm = None
+            if stat.st_size > MMAP_THRESHOLD:
+                try:
+                    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except (OSError, ValueError):
+                    # Emptied since the stat, or a filesystem without mmap support
+                    pass
+            if mm is not None:
+                with mm, memoryview(mm) as view:
+                    data = DataManager.loads(view)
+            else:
+                data = DataManager.loads(f.read())
+        
+        entry = (stamp, data)
+        with get_json_cache_lock():
+            cache[filename] = entry
+        return entry
+    
+    @staticmethod
+    def get_index(filename: str, field: str) -> dict:
+        """Map each value of field to the set of keys (or list positions) holding it; rebuilt lazily when the file changes"""
+        return DataManager.get_indexes(filename, (field,))[field]
+    
+    @staticmethod
+    def get_indexes(filename: str, fields) -> Dict[str, dict]:
+        """get_index for several fields at once, checking the file only once"""
+        try:
+            stamp, data = DataManager._load_cached(filename)
+        except Exception:
+            return {field: {} for field in fields}
+        return DataManager._build_indexes(filename, stamp, data, fields)
+    
+    @staticmethod
+    def load_indexed(filename: str, fields, default=None) -> Tuple[object, Dict[str, dict]]:
+        """load_json_readonly plus get_indexes, both taken from the same snapshot of the file"""
         if default is None:
             default = {}
         try:
-            if os.path.exists(filename):
-                with open(filename, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            stamp, data = DataManager._load_cached(filename)
+        except FileNotFoundError:
+            return default, {field: {} for field in fields}
         except Exception as e:
             st.error(f"Error loading {filename}: {e}")
-        return default
+            return default, {field: {} for field in fields}
+        return data, DataManager._build_indexes(filename, stamp, data, fields)
+    
+    @staticmethod
+    def _build_indexes(filename: str, stamp: tuple, data, fields) -> Dict[str, dict]:
+        """Indexes of data for fields, cached under filename until stamp changes"""
+        indexes = get_index_cache()
+        with get_json_cache_lock():
+            entry = indexes.get(filename)
+            if entry is None or entry[0] != stamp:
+                entry = indexes[filename] = (stamp, {})
+            missing = [field for field in fields if field not in entry[1]]
+            if missing:
+                built = {field: {} for field in missing}
+                records = data.items() if isinstance(data, dict) else enumerate(data) if isinstance(data, list) else ()
+                for key, record in records:
+                    if not isinstance(record, dict):
+                        continue
+                    for field, index in built.items():
+                        value = record.get(field)
+                        if value is None or isinstance(value, (str, int, float)):
+                            index.setdefault(value, set()).add(key)
+                entry[1].update(built)
+            return {field: entry[1][field] for field in fields}
+    
+    @staticmethod
+    def loads(raw):
+        """Parse JSON bytes (or a memoryview of them) with orjson when available"""
+        if orjson is not None:
+            return orjson.loads(raw)
+        if isinstance(raw, memoryview):
+            raw = raw.tobytes()
+        return json.loads(raw)
+    
+    @staticmethod
+    def dumps(data) -> bytes:
+        """Serialize data to indented UTF-8 JSON bytes with orjson when available"""
+        if orjson is not None:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    
+    @staticmethod
+    def update_cache(filename: str, data):
+        """Store freshly written data in the cache to avoid re-reading it"""
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return
+        with get_json_cache_lock():
+            get_json_cache()[filename] = (DataManager._stamp(stat), copy.deepcopy(data))
     
     @staticmethod
     def save_json(filename: str, data: dict, create_backup=True):
         """Save JSON data with atomic write and backup"""
-        with file_lock:
+        with get_file_lock(filename):
             try:
-                # Create backup if file exists
-                if create_backup and os.path.exists(filename):
+                # Create backup (a no-op if the file does not exist yet)
+                if create_backup:
                     DataManager.create_backup(filename)
                 
-                # Atomic write
+                # Atomic write, owner-only (users.json holds password hashes and citizen IDs), flushed before the rename
                 temp_file = f"{filename}.tmp"
-                with open(temp_file, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
+                fd = os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with os.fdopen(fd, 'wb', buffering=1 << 16) as f:
+                    f.write(DataManager.dumps(data))
+                    f.flush()
+                    os.fsync(fd)
                 
                 # Replace original file
-                shutil.move(temp_file, filename)
+                os.replace(temp_file, filename)
+                DataManager.update_cache(filename, data)
                 return True
             except Exception as e:
                 st.error(f"Error saving {filename}: {e}")
                 return False
     
+    @staticmethod
+    def save_upload(uploaded_file, file_path: str):
+        """Write an uploaded file to disk in UPLOAD_CHUNK_SIZE chunks through one reused buffer"""
+        buffer = bytearray(UPLOAD_CHUNK_SIZE)
+        view = memoryview(buffer)
+        uploaded_file.seek(0)
+        with open(file_path, 'wb') as f:
+            while True:
+                n = uploaded_file.readinto(buffer)
+                if not n:
+                    break
+                f.write(view[:n])
+    
+    @staticmethod
+    def remove_uploads(prefix: str) -> List[Tuple[str, Optional[Exception]]]:
+        """Unlink every file in UPLOAD_DIR whose name starts with prefix; returns (name, error or None) per match"""
+        with os.scandir(UPLOAD_DIR) as entries:
+            names = [entry.name for entry in entries if entry.name.startswith(prefix)]
+        if not names:
+            return []
+        
+        # Resolve names against one open directory handle where the platform allows it
+        dir_fd = os.open(UPLOAD_DIR, os.O_RDONLY) if os.unlink in os.supports_dir_fd else None
+        results = []
+        try:
+            for name in names:
+                try:
+                    os.unlink(name if dir_fd is not None else os.path.join(UPLOAD_DIR, name), dir_fd=dir_fd)
+                    results.append((name, None))
+                except OSError as e:
+                    results.append((name, e))
+        finally:
+            if dir_fd is not None:
+                os.close(dir_fd)
+        return results
+    
+    @staticmethod
+    def save_uploads(jobs: List[Tuple[object, str]], on_progress=None) -> List[Optional[Exception]]:
+        """Save (uploaded_file, file_path) pairs on the shared upload pool; returns each job's error, or None on success.
+        on_progress(fraction) is called from the calling thread as jobs finish."""
+        def save(job):
+            try:
+                DataManager.save_upload(*job)
+            except Exception as e:
+                return e
+            return None
+        
+        if not jobs:
+            return []
+        futures = [get_upload_pool().submit(save, job) for job in jobs]
+        if on_progress is not None:
+            for done, _ in enumerate(as_completed(futures), 1):
+                on_progress(done / len(futures))
+        return [future.result() for future in futures]
+    
     @staticmethod
     def create_backup(filename: str):
         """Create backup with timestamp"""
         if not os.path.exists(filename):
             return
         
+        prefix = Path(filename).stem
+        last_backup_times = get_last_backup_times()
+        now = time.monotonic()
+        if now - last_backup_times.get(prefix, float('-inf')) < BACKUP_INTERVAL:
+            return
+        
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_name = f"{Path(filename).stem}_{timestamp}.json"
+        backup_name = f"{prefix}_{timestamp}.json"
         backup_path = os.path.join(BACKUP_DIR, backup_name)
         
         try:
-            shutil.copy2(filename, backup_path)
-            DataManager.cleanup_old_backups(Path(filename).stem)
+            # save_json replaces the file by rename, so a hard link keeps this snapshot intact.
+            # The link shares the live file's inode: backups must never be opened for writing.
+            try:
+                os.link(filename, backup_path)
+            except FileExistsError:
+                # A backup was already taken this second
+                pass
+            except OSError:
+                # Cross-device or no hard link support
+                shutil.copy2(filename, backup_path)
+            last_backup_times[prefix] = now
+            counts = get_backup_counts()
+            if prefix in counts:
+                counts[prefix] += 1
+            DataManager.cleanup_old_backups(prefix)
         except Exception as e:
             st.error(f"Backup creation failed: {e}")
     
     @staticmethod
     def cleanup_old_backups(file_prefix: str):
         """Keep only the latest MAX_BACKUPS backups"""
+        counts = get_backup_counts()
+        if counts.get(file_prefix, MAX_BACKUPS + 1) <= MAX_BACKUPS:
+            return
+        
         try:
-            backup_files = [f for f in os.listdir(BACKUP_DIR) if f.startswith(file_prefix)]
+            with os.scandir(BACKUP_DIR) as entries:
+                backup_files = [e.name for e in entries if e.name.startswith(file_prefix)]
+            # Names embed the timestamp, so name order is age order
             backup_files.sort(reverse=True)
             
+            remaining = len(backup_files)
             for old_backup in backup_files[MAX_BACKUPS:]:
                 os.remove(os.path.join(BACKUP_DIR, old_backup))
+                remaining -= 1
+            counts[file_prefix] = remaining
         except Exception as e:
+            counts.pop(file_prefix, None)
             st.error(f"Backup cleanup failed: {e}")
 
+def read_file_bytes(file_path: str) -> bytes:
+    """Contents of an uploaded file"""
+    with open(file_path, 'rb') as f:
+        return f.read()
+
+def download_file_button(file_path: str, file_name: str, key: str, help_text: str):
+    """Download button that reads the file only after the user asks to prepare it.
+    Prepared keys live in session_state and are dropped once the download is clicked."""
+    if 'prepared_downloads' not in st.session_state:
+        st.session_state.prepared_downloads = set()
+    prepared = st.session_state.prepared_downloads
+    
+    if key not in prepared:
+        if st.button("ดาวน์โหลด", key=f"prepare_{key}", help=help_text, use_container_width=True, type="primary"):
+            prepared.add(key)
+            st.rerun()
+        return
+    
+    st.download_button(
+        "บันทึกไฟล์",
+        read_file_bytes(file_path),
+        file_name=file_name,
+        key=key,
+        help=help_text,
+        use_container_width=True,
+        type="primary",
+        on_click=prepared.discard,
+        args=(key,)
+    )
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def image_preview(file_path: str, mtime) -> bytes:
+    """Downscaled preview of an uploaded image; mtime is part of the key so edits invalidate the entry"""
+    try:
+        with Image.open(file_path) as img:
+            # Re-encoding drops EXIF, so apply its rotation to the pixels first
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail((PREVIEW_MAX_SIZE, PREVIEW_MAX_SIZE))
+            buffer = io.BytesIO()
+            if img.mode in ('RGBA', 'LA', 'P'):
+                img.save(buffer, 'PNG', optimize=True)
+            else:
+                img.convert('RGB').save(buffer, 'JPEG', quality=85)
+            return buffer.getvalue()
+    except OSError:
+        # Not decodable by Pillow; let the browser try the original bytes
+        with open(file_path, 'rb') as f:
+            return f.read()
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def index_uploads(dir_mtime_ns: int) -> Dict[str, List[str]]:
+    """Uploaded filenames grouped by citizen ID; keyed on UPLOAD_DIR's mtime so adds and removals invalidate it"""
+    index = defaultdict(list)
+    with os.scandir(UPLOAD_DIR) as entries:
+        for entry in entries:
+            if entry.is_file():
+                index[entry.name.split('_', 1)[0]].append(entry.name)
+    return dict(index)
+
+# Thai display names for document type slugs in uploaded filenames
+DOC_TYPE_NAMES = {
+    'photo': 'รูปถ่าย',
+    'id-card': 'สำเนาบัตรประจำตัวประชาชน',
+    'transcript': 'สำเนาใบแสดงผลการเรียน',
+    'name-change': 'หลักฐานการเปลี่ยนชื่อ-สกุล',
+    'other': 'เอกสารอื่นๆ'
+}
+
+@st.cache_data(ttl=15, max_entries=4, show_spinner=False)
+def build_student_documents(dir_mtime_ns: int) -> dict:
+    """Uploaded documents grouped by citizen ID for the admin documents tab; keyed on UPLOAD_DIR's mtime"""
+    with os.scandir(UPLOAD_DIR) as entries:
+        files = [(entry.name, entry.stat()) for entry in entries if entry.is_file()]
+    
+    students_data = {}
+    for filename, stat in files:
+        parts = filename.split('_')
+        if len(parts) >= 3:
+            citizen_id = parts[0]
+            student_name = parts[1].replace('-', ' ')
+            doc_type = parts[2].split('.')[0]
+            
+            if citizen_id not in students_data:
+                students_data[citizen_id] = {
+                    'name': student_name,
+                    'files': [],
+                    'has_photo': False,
+                    'has_id_card': False,
+                    'has_transcript': False,
+                    'has_name_change': False,
+                    'other_docs': 0
+                }
+            
+            students_data[citizen_id]['files'].append({
+                'filename': filename,
+                'doc_type': doc_type,
+                'doc_type_thai': DOC_TYPE_NAMES.get(doc_type, doc_type),
+                'size_kb': round(stat.st_size / 1024, 2),
+                'upload_date': time.strftime('%d/%m/%Y %H:%M', time.localtime(stat.st_mtime))
+            })
+            
+            # Track document completeness
+            if doc_type == 'รูปถ่าย':
+                students_data[citizen_id]['has_photo'] = True
+            elif doc_type == 'สำเนาบัตรประจำตัวประชาชน':
+                students_data[citizen_id]['has_id_card'] = True
+            elif doc_type == 'สำเนาใบแสดงผลการเรียน':
+                students_data[citizen_id]['has_transcript'] = True
+            elif doc_type == 'หลักฐานการเปลี่ยนชื่อ-สกุล':
+                students_data[citizen_id]['has_name_change'] = True
+            else:
+                students_data[citizen_id]['other_docs'] += 1
+    
+    # Precompute the fields the search and status filters read
+    for data in students_data.values():
+        data['name_lower'] = data['name'].lower()
+        data['is_complete'] = data['has_photo'] and data['has_id_card'] and data['has_transcript']
+    return students_data
+
+class LogWriter:
+    """Thread-safe append-only log writer that batches lines and flushes them in the background"""
+    FLUSH_INTERVAL = 0.2  # seconds
+    FLUSH_BYTES = 64 * 1024
+    MAX_BACKLOG = 8 * 1024 * 1024  # unwritten bytes kept per log file while writes keep failing
+    
+    def __init__(self):
+        self._queues = {}  # path -> (deque of encoded lines, per-path lock)
+        self._fds = {}
+        self._pending = 0
+        self.dropped = 0  # bytes discarded after exceeding MAX_BACKLOG
+        self._failing = set()  # paths whose last write failed, so a lasting error is reported once
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        threading.Thread(target=self._run, name="log-writer", daemon=True).start()
+    
+    def append(self, path: str, line: str):
+        """Queue a log line for writing"""
+        data = line.encode('utf-8')
+        with self._lock:
+            entry = self._queues.get(path)
+            if entry is None:
+                entry = self._queues[path] = (deque(), threading.Lock())
+            entry[0].append(data)
+            self._pending += len(data)
+            if self._pending >= self.FLUSH_BYTES:
+                self._wake.set()
+    
+    def flush(self):
+        """Write all queued lines, one write() per log file; a failed write stays queued for the next flush"""
+        with self._lock:
+            entries = list(self._queues.items())
+            self._pending = 0
+        for path, (queue, path_lock) in entries:
+            with path_lock:
+                chunks = []
+                while queue:
+                    chunks.append(queue.popleft())
+                if not chunks:
+                    continue
+                buf = memoryview(b''.join(chunks))
+                try:
+                    fd = self._fds.get(path)
+                    if fd is None:
+                        fd = self._fds[path] = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                    while buf:
+                        buf = buf[os.write(fd, buf):]
+                    self._failing.discard(path)
+                except OSError as e:
+                    # Reopen next time in case the descriptor went bad, and keep the unwritten bytes for the retry
+                    fd = self._fds.pop(path, None)
+                    if fd is not None:
+                        try:
+                            os.close(fd)
+                        except OSError:
+                            pass
+                    if len(buf) > self.MAX_BACKLOG:
+                        self.dropped += len(buf)
+                        sys.stderr.write(f"Error writing log {path}: {e}; dropped {len(buf)} bytes\n")
+                    else:
+                        queue.appendleft(bytes(buf))
+                        with self._lock:
+                            self._pending += len(buf)
+                        if path not in self._failing:
+                            sys.stderr.write(f"Error writing log {path}: {e}; will retry\n")
+                    self._failing.add(path)
+    
+    def _run(self):
+        while True:
+            self._wake.wait(self.FLUSH_INTERVAL)
+            self._wake.clear()
+            self.flush()
+
+@st.cache_resource
+def get_log_writer() -> LogWriter:
+    writer = LogWriter()
+    atexit.register(writer.flush)
+    return writer
+
+LOG_WRITER = get_log_writer()
+
+class SessionStore:
+    """In-process session table, snapshotted to SESSIONS_FILE in the background when changed"""
+    FLUSH_INTERVAL = 30  # seconds
+    
+    def __init__(self):
+        self.sessions = DataManager.load_json(SESSIONS_FILE, {})
+        self.lock = threading.Lock()
+        self.dirty = self._migrate()
+        threading.Thread(target=self._run, name="session-flush", daemon=True).start()
+    
+    def _migrate(self) -> bool:
+        """Give sessions saved with only an ISO expires_at an epoch expires_ts; drop unreadable ones"""
+        changed = False
+        for session_id, session in list(self.sessions.items()):
+            if 'expires_ts' in session:
+                continue
+            try:
+                session['expires_ts'] = datetime.datetime.fromisoformat(session['expires_at']).timestamp()
+            except (KeyError, TypeError, ValueError):
+                del self.sessions[session_id]
+            changed = True
+        return changed
+    
+    def flush(self):
+        """Write the sessions to disk if they changed since the last snapshot"""
+        with self.lock:
+            if not self.dirty:
+                return
+            snapshot = dict(self.sessions)
+            self.dirty = False
+        if not DataManager.save_json(SESSIONS_FILE, snapshot, create_backup=False):
+            self.dirty = True
+    
+    def _run(self):
+        while True:
+            time.sleep(self.FLUSH_INTERVAL)
+            with self.lock:
+                if AuthManager._sweep_expired(self.sessions, time.time()):
+                    self.dirty = True
+            self.flush()
+
+@st.cache_resource
+def get_session_store() -> SessionStore:
+    store = SessionStore()
+    atexit.register(store.flush)
+    return store
+
+# Format checks are pure functions of their input string, so their results are memoized
 class Validator:
     @staticmethod
+    @functools.lru_cache(maxsize=2048)
     def validate_thai_name(name: str) -> Tuple[bool, str]:
         """Validate Thai name format"""
-        if not name or len(name.strip()) < 2:
+        name = name.strip() if name else ''
+        if len(name) < 2:
             return False, "ชื่อต้องมีอย่างน้อย 2 ตัวอักษร"
         
         # Allow Thai characters, English characters, and spaces
-        thai_pattern = r'^[ก-๙a-zA-Z\s]+$'
-        if not re.match(thai_pattern, name.strip()):
+        if name.isascii() and name.isalpha():
+            return True, ""
+        if not THAI_NAME_RE.fullmatch(name):
             return False, "ชื่อสามารถใช้ได้เฉพาะตัวอักษรไทยและอังกฤษเท่านั้น"
         
         return True, ""
     
     @staticmethod
+    @functools.lru_cache(maxsize=2048)
     def validate_email(email: str) -> Tuple[bool, str]:
         """Validate email format"""
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(pattern, email):
+        if '@' not in email or not EMAIL_RE.fullmatch(email):
             return False, "รูปแบบอีเมลไม่ถูกต้อง"
         return True, ""
     
     @staticmethod
+    @functools.lru_cache(maxsize=2048)
     def validate_phone(phone: str) -> Tuple[bool, str]:
         """Validate Thai phone number"""
         # Remove spaces and dashes
-        phone = re.sub(r'[\s-]', '', phone)
+        if not phone.isdigit():
+            phone = PHONE_STRIP_RE.sub('', phone)
         
-        # Thai mobile patterns
-        if not re.match(r'^(06|08|09)\d{8}$', phone):
+        # Thai mobile patterns; the pattern also fixes the length at 10 ASCII digits
+        if not PHONE_RE.fullmatch(phone):
             return False, "หมายเลขโทรศัพท์ต้องเป็นเลข 10 หลัก เริ่มต้นด้วย 06, 08, หรือ 09"
         
         return True, ""
     
     @staticmethod
+    def clean_citizen_id(citizen_id: str) -> str:
+        """Strip every non-digit character from a citizen ID"""
+        if citizen_id.isascii() and citizen_id.isdigit():
+            return citizen_id
+        return NON_DIGIT_RE.sub('', citizen_id)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=2048)
     def validate_citizen_id(citizen_id: str) -> Tuple[bool, str]:
         """Validate Thai citizen ID - check length only"""
         if not citizen_id:
             return False, "กรุณากรอกเลขบัตรประชาชน"
         
         # Remove spaces, dashes, and other non-digit characters
-        clean_id = re.sub(r'[^0-9]', '', citizen_id)
+        clean_id = Validator.clean_citizen_id(citizen_id)
         
         # Check if empty after cleaning
         if not clean_id:
@@ -175,7 +735,7 @@ class Validator:
             return is_valid, error_msg
         
         # Clean the ID for uniqueness check
-        clean_id = re.sub(r'[^0-9]', '', citizen_id)
+        clean_id = Validator.clean_citizen_id(citizen_id)
         
         # Check for duplicates in the system
         if UserManager.check_duplicate('citizen_id', clean_id, exclude_username):
@@ -184,10 +744,17 @@ class Validator:
         return True, ""
     
     @staticmethod
+    @functools.lru_cache(maxsize=2048)
+    def parse_gpax(gpax: str) -> float:
+        """Parse a GPAX string to the 2-decimal score that gets stored"""
+        return round(float(gpax), 2)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=2048)
     def validate_gpax(gpax: str) -> Tuple[bool, str]:
         """Validate GPAX score"""
         try:
-            score = float(gpax)
+            score = Validator.parse_gpax(gpax)
             if not (0.0 <= score <= 4.0):
                 return False, "เกรดเฉลี่ยต้องอยู่ระหว่าง 0.00 - 4.00"
             return True, ""
@@ -197,22 +764,55 @@ class Validator:
 class AuthManager:
     @staticmethod
     def hash_password(password: str) -> str:
-        """Hash password using SHA-256"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Hash password using bcrypt (salt is stored in the hash string).
+        Raises ValueError for passwords over MAX_PASSWORD_BYTES, whatever the bcrypt version."""
+        password_bytes = password.encode()
+        if len(password_bytes) > MAX_PASSWORD_BYTES:
+            raise ValueError(PASSWORD_TOO_LONG_MSG)
+        return bcrypt.hashpw(password_bytes, bcrypt.gensalt(rounds=12)).decode()
+    
+    @staticmethod
+    def password_too_long(password: str) -> bool:
+        """True if password cannot be hashed with bcrypt"""
+        return len(password.encode()) > MAX_PASSWORD_BYTES
+    
+    @staticmethod
+    def is_legacy_hash(stored_hash: str) -> bool:
+        """Check if stored hash is a legacy unsalted SHA-256 hex digest"""
+        return len(stored_hash) == 64
+    
+    @staticmethod
+    def verify_password(password: str, stored_hash: str) -> bool:
+        """Verify password against a bcrypt hash or a legacy SHA-256 hash"""
+        if not stored_hash:
+            return False
+        
+        password_bytes = password.encode()
+        if AuthManager.is_legacy_hash(stored_hash):
+            return hmac.compare_digest(hashlib.sha256(password_bytes).hexdigest(), stored_hash)
+        
+        try:
+            return bcrypt.checkpw(password_bytes, stored_hash.encode())
+        except ValueError:
+            return False
     
     @staticmethod
     def create_session(username: str) -> str:
         """Create new session"""
         session_id = str(uuid.uuid4())
-        sessions = DataManager.load_json(SESSIONS_FILE, {})
-        
-        sessions[session_id] = {
-            'username': username,
-            'created_at': datetime.datetime.now().isoformat(),
-            'expires_at': (datetime.datetime.now() + datetime.timedelta(seconds=SESSION_TIMEOUT)).isoformat()
-        }
+        store = get_session_store()
         
-        DataManager.save_json(SESSIONS_FILE, sessions)
+        now = datetime.datetime.now()
+        expires_at = now + datetime.timedelta(seconds=SESSION_TIMEOUT)
+        with store.lock:
+            AuthManager._sweep_expired(store.sessions, now.timestamp())
+            store.sessions[session_id] = {
+                'username': username,
+                'created_at': now.isoformat(),
+                'expires_at': expires_at.isoformat(),
+                'expires_ts': expires_at.timestamp()
+            }
+            store.dirty = True
         return session_id
     
     @staticmethod
@@ -221,76 +821,107 @@ class AuthManager:
         if not session_id:
             return None
         
-        sessions = DataManager.load_json(SESSIONS_FILE, {})
-        session = sessions.get(session_id)
+        store = get_session_store()
+        session = store.sessions.get(session_id)
         
         if not session:
             return None
         
-        # Check expiry
-        expires_at = datetime.datetime.fromisoformat(session['expires_at'])
-        if datetime.datetime.now() > expires_at:
-            # Remove expired session
-            del sessions[session_id]
-            DataManager.save_json(SESSIONS_FILE, sessions)
+        # Evict in memory only; the background flush persists the removal
+        if time.time() > session['expires_ts']:
+            with store.lock:
+                if store.sessions.pop(session_id, None) is not None:
+                    store.dirty = True
             return None
         
         return session['username']
     
+    @staticmethod
+    def _sweep_expired(sessions: dict, now_ts: float) -> int:
+        """Drop expired sessions in place, at most once per SESSION_SWEEP_INTERVAL"""
+        state = get_session_sweep_state()
+        with state['lock']:
+            if time.monotonic() - state['last'] < SESSION_SWEEP_INTERVAL:
+                return 0
+            state['last'] = time.monotonic()
+        
+        expired = [sid for sid, session in sessions.items()
+                   if session['expires_ts'] < now_ts]
+        for sid in expired:
+            del sessions[sid]
+        return len(expired)
+    
     @staticmethod
     def logout(session_id: str):
         """Remove session"""
         if not session_id:
             return
         
-        sessions = DataManager.load_json(SESSIONS_FILE, {})
-        if session_id in sessions:
-            del sessions[session_id]
-            DataManager.save_json(SESSIONS_FILE, sessions)
+        store = get_session_store()
+        with store.lock:
+            if store.sessions.pop(session_id, None) is not None:
+                store.dirty = True
+    
+    @staticmethod
+    def remove_user_sessions(username: str):
+        """Remove every session belonging to username"""
+        store = get_session_store()
+        with store.lock:
+            session_ids = [sid for sid, session in store.sessions.items() if session.get('username') == username]
+            for session_id in session_ids:
+                del store.sessions[session_id]
+            if session_ids:
+                store.dirty = True
 
 class UserManager:
     @staticmethod
     def check_duplicate(field: str, value: str, exclude_username: str = None) -> bool:
         """Check if value already exists for given field"""
-        users = DataManager.load_json(USERS_FILE, {})
-        
-        for username, user_data in users.items():
-            if exclude_username and username == exclude_username:
-                continue
-            if user_data.get(field) == value:
-                return True
-        return False
+        return UserManager.find_duplicate({field: value}, exclude_username) is not None
+    
+    @staticmethod
+    def find_duplicate(values: dict, exclude_username: str = None) -> Optional[str]:
+        """Return the first field whose value is already used by another user, or None"""
+        indexes = DataManager.get_indexes(USERS_FILE, tuple(values))
+        for field, value in values.items():
+            owners = indexes[field].get(value)
+            if owners and any(owner != exclude_username for owner in owners):
+                return field
+        return None
     
     @staticmethod
     def register_user(user_data: dict) -> Tuple[bool, str]:
         """Register new user"""
-        users = DataManager.load_json(USERS_FILE, {})
-        
-        # Check duplicates
-        duplicate_checks = [
-            ('username', 'ชื่อผู้ใช้'),
-            ('email', 'อีเมล'),
-            ('phone', 'หมายเลขโทรศัพท์'),
-            ('citizen_id', 'เลขบัตรประชาชน')
-        ]
+        unique_values = {field: user_data[field] for field in ('username', 'email', 'phone', 'citizen_id')}
         
-        for field, field_name in duplicate_checks:
-            if UserManager.check_duplicate(field, user_data[field]):
-                return False, f"{field_name}นี้ถูกใช้งานแล้ว"
+        # Check duplicates before paying for the password hash
+        duplicate = UserManager.find_duplicate(unique_values)
+        if duplicate:
+            return False, f"{DUPLICATE_FIELD_NAMES[duplicate]}นี้ถูกใช้งานแล้ว"
         
         # Hash password
+        if AuthManager.password_too_long(user_data['password']):
+            return False, PASSWORD_TOO_LONG_MSG
         user_data['password'] = AuthManager.hash_password(user_data['password'])
-        user_data['created_at'] = datetime.datetime.now().isoformat()
+        now_iso = datetime.datetime.now().isoformat()
+        user_data['created_at'] = now_iso
         user_data['role'] = 'user'
         
-        # Save user
-        users[user_data['username']] = user_data
+        # Re-check and save under the file lock so concurrent registrations cannot overwrite each other
+        with get_file_lock(USERS_FILE):
+            duplicate = UserManager.find_duplicate(unique_values)
+            if duplicate:
+                return False, f"{DUPLICATE_FIELD_NAMES[duplicate]}นี้ถูกใช้งานแล้ว"
+            
+            users = DataManager.load_json(USERS_FILE, {})
+            users[user_data['username']] = user_data
+            saved = DataManager.save_json(USERS_FILE, users)
         
-        if DataManager.save_json(USERS_FILE, users):
+        if saved:
+            get_user_cached.clear()
             # Log registration
-            log_entry = f"{datetime.datetime.now().isoformat()} - User registered: {user_data['username']}\n"
-            with open(os.path.join(LOG_DIR, 'user_changes.log'), 'a', encoding='utf-8') as f:
-                f.write(log_entry)
+            log_entry = f"{now_iso} - User registered: {user_data['username']}\n"
+            LOG_WRITER.append(os.path.join(LOG_DIR, 'user_changes.log'), log_entry)
             return True, "ลงทะเบียนสำเร็จ"
         
         return False, "เกิดข้อผิดพลาดในการบันทึกข้อมูล"
@@ -298,67 +929,136 @@ class UserManager:
     @staticmethod
     def authenticate(username: str, password: str) -> Tuple[bool, str, dict]:
         """Authenticate user"""
-        users = DataManager.load_json(USERS_FILE, {})
+        users = DataManager.load_json_readonly(USERS_FILE, {})
         
         if username not in users:
             return False, "ชื่อผู้ใช้หรือรหัสผ่านไม่ถูกต้อง", {}
         
-        user = users[username]
-        hashed_password = AuthManager.hash_password(password)
+        user = dict(users[username])
         
-        if user['password'] != hashed_password:
+        if not AuthManager.verify_password(password, user.get('password', '')):
             return False, "ชื่อผู้ใช้หรือรหัสผ่านไม่ถูกต้อง", {}
         
+        # Upgrade legacy SHA-256 hash to bcrypt on successful login; best-effort, so a
+        # password bcrypt cannot hash keeps its legacy hash instead of failing the login
+        if AuthManager.is_legacy_hash(user['password']):
+            try:
+                new_hash = AuthManager.hash_password(password)
+            except ValueError:
+                new_hash = None
+            if new_hash is not None:
+                user['password'] = new_hash
+                with get_file_lock(USERS_FILE):
+                    users = DataManager.load_json(USERS_FILE, {})
+                    if username in users:
+                        users[username]['password'] = new_hash
+                        DataManager.save_json(USERS_FILE, users)
+                get_user_cached.clear()
+        
         return True, "เข้าสู่ระบบสำเร็จ", user
     
     @staticmethod
     def get_user(username: str) -> Optional[dict]:
         """Get user data"""
-        users = DataManager.load_json(USERS_FILE, {})
-        return users.get(username)
+        user = DataManager.load_json_readonly(USERS_FILE, {}).get(username)
+        return dict(user) if user is not None else None
     
     @staticmethod
     def update_user(username: str, updated_data: dict) -> Tuple[bool, str]:
         """Update user data"""
-        users = DataManager.load_json(USERS_FILE, {})
-        
-        if username not in users:
-            return False, "ไม่พบผู้ใช้"
-        
-        # Check duplicates for changed fields
-        current_user = users[username]
-        duplicate_checks = [('email', 'อีเมล'), ('phone', 'หมายเลขโทรศัพท์'), ('citizen_id', 'เลขบัตรประชาชน')]
-        
-        for field, field_name in duplicate_checks:
-            if field in updated_data and updated_data[field] != current_user.get(field):
-                if UserManager.check_duplicate(field, updated_data[field], username):
-                    return False, f"{field_name}นี้ถูกใช้งานแล้ว"
-        
-        # Log changes
-        changes = []
-        for key, new_value in updated_data.items():
-            if key != 'password' and current_user.get(key) != new_value:
-                changes.append(f"{key}: {current_user.get(key)} -> {new_value}")
-        
-        # Update user data
-        users[username].update(updated_data)
-        users[username]['updated_at'] = datetime.datetime.now().isoformat()
+        # Hold the users.json lock from load to save so concurrent edits are not lost
+        with get_file_lock(USERS_FILE):
+            users = DataManager.load_json(USERS_FILE, {})
+            
+            if username not in users:
+                return False, "ไม่พบผู้ใช้"
+            
+            # Check duplicates for changed fields
+            current_user = users[username]
+            changed = {field: updated_data[field] for field in ('email', 'phone', 'citizen_id')
+                       if field in updated_data and updated_data[field] != current_user.get(field)}
+            duplicate = UserManager.find_duplicate(changed, username) if changed else None
+            if duplicate:
+                return False, f"{DUPLICATE_FIELD_NAMES[duplicate]}นี้ถูกใช้งานแล้ว"
+            
+            # Log changes
+            changes = []
+            for key, new_value in updated_data.items():
+                if key != 'password' and current_user.get(key) != new_value:
+                    changes.append(f"{key}: {current_user.get(key)} -> {new_value}")
+            
+            # Update user data
+            users[username].update(updated_data)
+            now_iso = datetime.datetime.now().isoformat()
+            users[username]['updated_at'] = now_iso
+            saved = DataManager.save_json(USERS_FILE, users)
         
-        if DataManager.save_json(USERS_FILE, users):
+        if saved:
+            get_user_cached.clear()
             # Log profile changes
             if changes:
-                log_entry = f"{datetime.datetime.now().isoformat()} - Profile updated for {username}: {'; '.join(changes)}\n"
-                with open(os.path.join(LOG_DIR, 'profile_changes.log'), 'a', encoding='utf-8') as f:
-                    f.write(log_entry)
+                log_entry = f"{now_iso} - Profile updated for {username}: {'; '.join(changes)}\n"
+                LOG_WRITER.append(os.path.join(LOG_DIR, 'profile_changes.log'), log_entry)
             return True, "อัพเดทข้อมูลสำเร็จ"
         
         return False, "เกิดข้อผิดพลาดในการบันทึกข้อมูล"
 
+@st.cache_data(ttl=60, show_spinner=False)
+def get_user_cached(username: str) -> Optional[dict]:
+    """Per-rerun user lookup; cleared whenever users.json is written"""
+    return UserManager.get_user(username)
+
 class MessageManager:
+    @staticmethod
+    def _load(readonly: bool = False) -> dict:
+        """Load messages keyed by id, converting the older list format on disk first"""
+        messages = DataManager.load_json_readonly(MESSAGES_FILE, {})
+        if isinstance(messages, list) or DataManager.get_index(MESSAGES_FILE, 'id').get(None):
+            with get_file_lock(MESSAGES_FILE):
+                # Re-check under the lock; another session may have converted the file already
+                messages = DataManager.load_json_readonly(MESSAGES_FILE, {})
+                if isinstance(messages, list) or DataManager.get_index(MESSAGES_FILE, 'id').get(None):
+                    messages = MessageManager._normalize(messages)
+                    # Even if the save fails, callers get the converted dict for this run
+                    DataManager.save_json(MESSAGES_FILE, messages)
+                    return messages
+        if readonly:
+            return messages
+        return DataManager.load_json(MESSAGES_FILE, {})
+    
+    @staticmethod
+    def _normalize(messages) -> dict:
+        """Key messages by id, giving each one an id field and a string timestamp"""
+        records = messages.items() if isinstance(messages, dict) else ((msg.get('id'), msg) for msg in messages)
+        normalized = {}
+        for key, msg in records:
+            key = key or str(uuid.uuid4())
+            normalized[key] = {**msg, 'id': key, 'timestamp': msg.get('timestamp') or ''}
+        return normalized
+    
+    @staticmethod
+    def _load_indexed(field: str) -> Tuple[dict, dict]:
+        """Messages and an index on field, both from the same snapshot of the file"""
+        MessageManager._load(readonly=True)
+        messages, indexes = DataManager.load_indexed(MESSAGES_FILE, (field,))
+        if isinstance(messages, dict):
+            return messages, indexes[field]
+        # The converted file could not be saved; index the converted copy directly
+        messages = MessageManager._normalize(messages)
+        index = {}
+        for message_id, message in messages.items():
+            index.setdefault(message.get(field), set()).add(message_id)
+        return messages, index
+    
+    @staticmethod
+    def _sort_key(message: dict) -> str:
+        """Newest-first sort key; missing timestamps sort last"""
+        return message.get('timestamp') or ''
+    
     @staticmethod
     def send_message(sender_username: str, subject: str, message: str, message_type: str = "general") -> Tuple[bool, str]:
         """Send message to admin"""
-        messages = DataManager.load_json(MESSAGES_FILE, [])
+        now_iso = datetime.datetime.now().isoformat()
         
         message_data = {
             "id": str(uuid.uuid4()),
@@ -366,463 +1066,333 @@ class MessageManager:
             "subject": subject,
             "message": message,
             "message_type": message_type,
-            "timestamp": datetime.datetime.now().isoformat(),
+            "timestamp": now_iso,
             "is_read": False,
             "reply": None,
             "reply_timestamp": None
         }
         
-        messages.append(message_data)
+        with get_file_lock(MESSAGES_FILE):
+            messages = MessageManager._load()
+            messages[message_data['id']] = message_data
+            saved = DataManager.save_json(MESSAGES_FILE, messages)
         
-        if DataManager.save_json(MESSAGES_FILE, messages):
+        if saved:
             # Log message
-            log_entry = f"{datetime.datetime.now().isoformat()} - Message sent from {sender_username}: {subject}\n"
-            with open(os.path.join(LOG_DIR, 'messages.log'), 'a', encoding='utf-8') as f:
-                f.write(log_entry)
+            log_entry = f"{now_iso} - Message sent from {sender_username}: {subject}\n"
+            LOG_WRITER.append(os.path.join(LOG_DIR, 'messages.log'), log_entry)
             return True, "ส่งข้อความสำเร็จ"
         
         return False, "เกิดข้อผิดพลาดในการส่งข้อความ"
     
     @staticmethod
     def get_messages(unread_only: bool = False) -> List[dict]:
-        """Get all messages or unread messages only"""
-        messages = DataManager.load_json(MESSAGES_FILE, [])
-        
+        """Get all messages or unread messages only, newest first"""
         if unread_only:
-            return [msg for msg in messages if not msg.get('is_read', False)]
+            messages, read_index = MessageManager._load_indexed('is_read')
+            unread = read_index.get(False, set()) | read_index.get(None, set())
+            selected = [messages[message_id] for message_id in unread if message_id in messages]
+        else:
+            selected = MessageManager._load(readonly=True).values()
         
         # Sort by timestamp (newest first)
-        return sorted(messages, key=lambda x: x.get('timestamp', ''), reverse=True)
+        return sorted(selected, key=MessageManager._sort_key, reverse=True)
     
     @staticmethod
     def mark_as_read(message_id: str) -> bool:
         """Mark message as read"""
-        messages = DataManager.load_json(MESSAGES_FILE, [])
-        
-        for message in messages:
-            if message.get('id') == message_id:
-                message['is_read'] = True
-                return DataManager.save_json(MESSAGES_FILE, messages)
-        
-        return False
+        with get_file_lock(MESSAGES_FILE):
+            messages = MessageManager._load()
+            
+            message = messages.get(message_id)
+            if message is None:
+                return False
+            message['is_read'] = True
+            return DataManager.save_json(MESSAGES_FILE, messages, create_backup=False)
     
     @staticmethod
     def reply_to_message(message_id: str, reply_text: str) -> bool:
         """Reply to a message"""
-        messages = DataManager.load_json(MESSAGES_FILE, [])
-        
-        for message in messages:
-            if message.get('id') == message_id:
-                message['reply'] = reply_text
-                message['reply_timestamp'] = datetime.datetime.now().isoformat()
-                message['is_read'] = True
-                return DataManager.save_json(MESSAGES_FILE, messages)
-        
-        return False
+        with get_file_lock(MESSAGES_FILE):
+            messages = MessageManager._load()
+            
+            message = messages.get(message_id)
+            if message is None:
+                return False
+            message['reply'] = reply_text
+            message['reply_timestamp'] = datetime.datetime.now().isoformat()
+            message['is_read'] = True
+            return DataManager.save_json(MESSAGES_FILE, messages, create_backup=False)
     
     @staticmethod
     def delete_message(message_id: str) -> bool:
         """Delete a message"""
-        messages = DataManager.load_json(MESSAGES_FILE, [])
-        
-        messages = [msg for msg in messages if msg.get('id') != message_id]
-        
-        return DataManager.save_json(MESSAGES_FILE, messages)
+        with get_file_lock(MESSAGES_FILE):
+            messages = MessageManager._load()
+            
+            if messages.pop(message_id, None) is None:
+                return True
+            
+            return DataManager.save_json(MESSAGES_FILE, messages, create_backup=False)
     
     @staticmethod
     def get_user_messages(username: str) -> List[dict]:
         """Get messages from specific user"""
-        messages = DataManager.load_json(MESSAGES_FILE, [])
+        messages, sender_index = MessageManager._load_indexed('sender_username')
         
-        user_messages = [msg for msg in messages if msg.get('sender_username') == username]
+        message_ids = sender_index.get(username, ())
+        user_messages = [messages[message_id] for message_id in message_ids if message_id in messages]
         
         # Sort by timestamp (newest first)
-        return sorted(user_messages, key=lambda x: x.get('timestamp', ''), reverse=True)
+        return sorted(user_messages, key=MessageManager._sort_key, reverse=True)
 
-def init_admin_user():
-    """Initialize admin user if not exists"""
-    users = DataManager.load_json(USERS_FILE, {})
-    
-    if 'admin' not in users:
-        admin_data = {
-            'username': 'admin',
-            'password': AuthManager.hash_password('admin123'),
-            'role': 'admin',
-            'first_name': 'ผู้ดูแล',
-            'last_name': 'ระบบ',
-            'email': 'admin@university.ac.th',
-            'phone': '0800000000',
-            'citizen_id': '1234567890123',
-            'created_at': datetime.datetime.now().isoformat()
-        }
-        users['admin'] = admin_data
-        DataManager.save_json(USERS_FILE, users)
+@st.cache_resource
+def init_admin_user() -> bool:
+    """Initialize admin user if not exists; runs once per process rather than on every rerun.
+    A failed save raises, so the failure is not cached and the next rerun tries again."""
+    if 'admin' not in DataManager.load_json_readonly(USERS_FILE, {}):
+        admin_password = AuthManager.hash_password('admin123')
+        with get_file_lock(USERS_FILE):
+            users = DataManager.load_json(USERS_FILE, {})
+            if 'admin' not in users:
+                users['admin'] = {
+                    'username': 'admin',
+                    'password': admin_password,
+                    'role': 'admin',
+                    'first_name': 'ผู้ดูแล',
+                    'last_name': 'ระบบ',
+                    'email': 'admin@university.ac.th',
+                    'phone': '0800000000',
+                    'citizen_id': '1234567890123',
+                    'created_at': datetime.datetime.now().isoformat()
+                }
+                if not DataManager.save_json(USERS_FILE, users):
+                    raise OSError(f"Could not create the admin user in {USERS_FILE}")
+        get_user_cached.clear()
+    return True
 
-# Initialize admin user
-init_admin_user()
+# Initialize admin user; save_json has already reported a failed write
+try:
+    init_admin_user()
+except OSError:
+    pass
 
 # Streamlit app configuration
+LOGO_URL = "https://upload.wikimedia.org/wikipedia/th/thumb/b/bb/Informatics_MSU_Logo.svg/1200px-Informatics_MSU_Logo.svg.png"
+
 st.set_page_config(
     page_title="ระบบอัพโหลดเอกสารสมัครเรียน",
-    page_icon="https://upload.wikimedia.org/wikipedia/th/thumb/b/bb/Informatics_MSU_Logo.svg/1200px-Informatics_MSU_Logo.svg.png",
+    page_icon=LOGO_URL,
     layout="wide",
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS
-st.markdown("""
+# Stylesheet, read once per process
+CSS_FILE = Path(__file__).parent / "static" / "style.css"
+
+@st.cache_data(show_spinner=False)
+def load_css() -> str:
+    """Font links plus the stylesheet, assembled once so reruns only re-send the cached string"""
+    return f"""
 <link rel="preconnect" href="https://fonts.googleapis.com">
 <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
 <link href="https://fonts.googleapis.com/css2?family=IBM+Plex+Sans+Thai:wght@100;200;300;400;500;600;700&display=swap" rel="stylesheet">
 
 <style>
-/* Global font family */
-* {
-    font-family: 'IBM Plex Sans Thai', sans-serif !important;
-}
-
-body {
-    font-family: 'IBM Plex Sans Thai', sans-serif !important;
-}
-
-.main-header {
-    text-align: center;
-    padding: 2rem 1rem;
-    background: linear-gradient(135deg, #1e40af 0%, #1e3a8a 50%, #312e81 100%);
-    border-radius: 15px;
-    margin-bottom: 2rem;
-    color: white;
-}
-.logo-circle {
-    width: 80px;
-    height: 80px;
-    background: rgba(255, 255, 255, 0.2);
-    border-radius: 50%;
-    display: flex;
-    align-items: center;
-    justify-content: center;
-    margin: 0 auto 1rem auto;
-    border: 2px solid rgba(255, 255, 255, 0.3);
-}
-.logo-circle img {
-    width: 50px;
-    height: 50px;
-    border-radius: 50%;
-}
-.main-header h1 {
-    margin: 0.5rem 0;
-    font-size: 2rem;
-    font-weight: 700;
-}
-.main-header h3 {
-    margin: 0.5rem 0;
-    font-size: 1.3rem;
-    font-weight: 400;
-    opacity: 0.9;
-}
-.main-header p {
-    margin: 1rem 0 0 0;
-    font-size: 1rem;
-    opacity: 0.8;
-}
-
-/* Center container for personal info and edit pages */
-.center-container {
-    max-width: 900px;
-    margin: 0 auto;
-    padding: 0 1rem;
-}
-
-/* Global animations */
-@keyframes slideIn {
-    from {
-        opacity: 0;
-        transform: translateY(-20px);
-    }
-    to {
-        opacity: 1;
-        transform: translateY(0);
-    }
-}
-
-@keyframes rotate {
-    from { transform: rotate(0deg); }
-    to { transform: rotate(360deg); }
-}
-
-@keyframes pulse {
-    0% { transform: scale(1); }
-    50% { transform: scale(1.05); }
-    100% { transform: scale(1); }
-}
-
-@keyframes float {
-    0%, 100% { transform: translateY(0px); }
-    50% { transform: translateY(-10px); }
-}
-
-/* Action button styling */
-.action-button {
-    transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-    transform: translateY(0);
-}
-
-.action-button:hover {
-    transform: translateY(-3px);
-    box-shadow: 0 10px 25px rgba(0,0,0,0.2);
-}
-
-.success-message {
-    padding: 1rem;
-    background: #d4edda;
-    border: 1px solid #c3e6cb;
-    border-radius: 5px;
-    color: #155724;
-}
-
-.error-message {
-    padding: 1rem;
-    background: #f8d7da;
-    border: 1px solid #f5c6cb;
-    border-radius: 5px;
-    color: #721c24;
-}
-
-.info-box {
-    padding: 1rem;
-    background: #e2e3e5;
-    border-radius: 5px;
-    margin: 1rem 0;
-}
+{CSS_FILE.read_text(encoding='utf-8')}
+</style>
+"""
 
-/* Enhanced file uploader styling */
-.stFileUploader > div > div > div > div {
-    background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
-    border: 2px dashed #1e40af;
-    border-radius: 15px;
-    padding: 2rem;
-    transition: all 0.3s ease;
-}
+# Simple header with logo
+HEADER_HTML = f"""
+<div class="main-header">
+    <img src="{LOGO_URL}" 
+         style="width:80px;height:80px;object-fit:cover;margin:0 auto 1rem auto;display:block;" 
+         onerror="this.style.display='none'; this.nextElementSibling.style.display='block';">
+    <div style="width:60px;height:60px;background:white;color:#1e40af;font-weight:bold;font-size:1.2rem;display:none;margin:0 auto 1rem auto;text-align:center;line-height:60px;border-radius:8px;">MSU</div>
+    <h1>ระบบอัพโหลดเอกสารสมัครเรียน</h1>
+    <h3>มหาวิทยาลัยมหาสารคาม</h3>
+</div>
+"""
 
-.stFileUploader > div > div > div > div:hover {
-    border-color: #1e3a8a;
-    background: linear-gradient(135deg, #bfdbfe 0%, #60a5fa 100%);
-    transform: translateY(-2px);
-    box-shadow: 0 8px 25px rgba(0,123,255,0.15);
-}
+# Card shown after a password-reset request is sent
+PW_RESET_SUCCESS_HTML = """
+<div class="pw-reset-card">
+    <div class="pw-reset-icon">🔑</div>
+    <h3>ส่งคำขอรีเซ็ตรหัสผ่านสำเร็จ!</h3>
+    <div class="pw-reset-body">
+        <p><strong>รหัสผ่านใหม่ของคุณจะเป็น:</strong><br>
+        <span class="pw-reset-highlight">เลขบัตรประจำตัวประชาชนของคุณ</span></p>
+        <p>ผู้ดูแลระบบจะติดต่อกลับภายใน <strong>1-2 วันทำการ</strong></p>
+    </div>
+    <div class="pw-reset-footer">
+        💡 <em>กรุณาเก็บรักษาข้อมูลนี้ไว้เป็นความลับ</em>
+    </div>
+</div>
+"""
 
-/* Radio button styling */
-.stRadio > div {
-    background: #f8f9fa;
-    padding: 1rem;
-    border-radius: 10px;
-    border: 1px solid #e9ecef;
-}
+# Banner above the forgot-password form
+FORGOT_PASSWORD_BANNER_HTML = """
+<div class="pw-reset-banner">
+    <h4>ขอรีเซ็ตรหัสผ่าน</h4>
+    <p>กรุณากรอกข้อมูลด้านล่างเพื่อส่งคำขอรีเซ็ตรหัสผ่านไปยังผู้ดูแลระบบ</p>
+</div>
+"""
 
-.stRadio > div > label {
-    background: white;
-    padding: 0.8rem 1.2rem;
-    margin: 0.3rem 0;
-    border-radius: 8px;
-    border: 1px solid #dee2e6;
-    transition: all 0.2s ease;
-    cursor: pointer;
-}
+# Registration form hint and account rules
+REGISTER_HINT_TEXT = "**คำแนะนำ**\n\nกรุณาจดจำชื่อผู้ใช้และรหัสผ่านไว้สำหรับเข้าสู่ระบบ"
+REGISTER_RULES_TEXT = """
+**ชื่อผู้ใช้:**
+• ความยาว 4-20 ตัวอักษร
+• ใช้ได้เฉพาะตัวอักษรและตัวเลข
 
-.stRadio > div > label:hover {
-    background: #bfdbfe;
-    border-color: #1e40af;
-    transform: translateX(5px);
-}
+**รหัสผ่าน:**
+• ความยาวอย่างน้อย 6 ตัวอักษร
+• ควรใช้ตัวอักษรและตัวเลขผสมกัน
+"""
 
-/* Form submit button enhancement */
-.stFormSubmitButton > button {
-    background: linear-gradient(135deg, #1e40af 0%, #1e3a8a 100%);
-    border: none;
-    border-radius: 12px;
-    padding: 1rem 2rem;
-    font-size: 1.1rem;
-    font-weight: 600;
-    color: white;
-    transition: all 0.3s ease;
-    box-shadow: 0 4px 15px rgba(0,123,255,0.3);
-}
+# Document slots of the upload forms, in display order
+UploadDoc = namedtuple('UploadDoc', 'title icon tone key types help required')
 
-.stFormSubmitButton > button:hover {
-    transform: translateY(-2px);
-    box-shadow: 0 8px 25px rgba(0,123,255,0.4);
-    background: linear-gradient(135deg, #1e40af 0%, #1e3a8a 100%);
-}
+ADMIN_UPLOAD_DOCUMENTS = (
+    UploadDoc(
+        title="1. รูปถ่าย",
+        icon="",
+        tone="red",
+        key="admin_photo_upload",
+        types=('jpg', 'jpeg', 'png'),
+        help="รูปถ่ายหน้าตรง ชัดเจน • JPG, JPEG, PNG • สูงสุด 200MB",
+        required=True
+    ),
+    UploadDoc(
+        title="2. สำเนาบัตรประจำตัวประชาชน",
+        icon="",
+        tone="green",
+        key="admin_id_card_upload",
+        types=('pdf', 'jpg', 'jpeg', 'png'),
+        help="สำเนาบัตรประชาชนที่ชัดเจน • PDF, JPG, JPEG, PNG • สูงสุด 200MB",
+        required=True
+    ),
+    UploadDoc(
+        title="3. สำเนาใบแสดงผลการเรียน",
+        icon="",
+        tone="yellow",
+        key="admin_transcript_upload",
+        types=('pdf', 'jpg', 'jpeg', 'png'),
+        help="ใบแสดงผลการเรียน • PDF, JPG, JPEG, PNG • สูงสุด 200MB",
+        required=True
+    ),
+    UploadDoc(
+        title="4. หลักฐานการเปลี่ยนชื่อ-สกุล หรือหลักฐานอื่นๆ",
+        icon="",
+        tone="gray",
+        key="admin_other_upload",
+        types=('pdf', 'jpg', 'jpeg', 'png'),
+        help="เอกสารเพิ่มเติม • PDF, JPG, JPEG, PNG • สูงสุด 200MB",
+        required=False
+    )
+)
 
-/* Tab styling enhancement */
-.stTabs [data-baseweb="tab-list"] {
-    gap: 8px;
-    background: #f8f9fa;
-    padding: 0.5rem;
-    border-radius: 15px;
-    margin-bottom: 2rem;
-}
+USER_UPLOAD_DOCUMENTS = (
+    UploadDoc(
+        title="1. รูปถ่าย",
+        icon="",
+        tone="blue",
+        key="photo_upload",
+        types=('jpg', 'jpeg', 'png'),
+        help="รูปถ่ายหน้าตรง ชัดเจน • JPG, JPEG, PNG • สูงสุด 200MB",
+        required=True
+    ),
+    UploadDoc(
+        title="2. สำเนาบัตรประจำตัวประชาชน",
+        icon="",
+        tone="green",
+        key="id_card_upload",
+        types=('pdf', 'jpg', 'jpeg', 'png'),
+        help="สำเนาบัตรประชาชนที่ชัดเจน • PDF, JPG, JPEG, PNG • สูงสุด 200MB",
+        required=True
+    ),
+    UploadDoc(
+        title="3. สำเนาใบแสดงผลการเรียน",
+        icon="",
+        tone="yellow",
+        key="transcript_upload",
+        types=('pdf', 'jpg', 'jpeg', 'png'),
+        help="ใบแสดงผลการเรียน (ม.6) • PDF, JPG, JPEG, PNG • สูงสุด 200MB",
+        required=True
+    ),
+    UploadDoc(
+        title="4. สำเนาหลักฐานการเปลี่ยนชื่อ-สกุล หรือหลักฐานอื่นๆ",
+        icon="",
+        tone="gray",
+        key="other_upload",
+        types=('pdf', 'jpg', 'jpeg', 'png'),
+        help="เฉพาะกรณีที่มีการเปลี่ยนชื่อ-สกุล • PDF, JPG, JPEG, PNG • สูงสุด 200MB",
+        required=False
+    )
+)
 
-.stTabs [data-baseweb="tab"] {
-    background: white;
-    border-radius: 10px;
-    padding: 0.8rem 1.5rem;
-    border: 1px solid #e9ecef;
-    transition: all 0.3s ease;
-}
+# Upload form card for one document type
+DOC_CARD_TEMPLATE = """
+<div class="doc-card doc-card--{tone}">
+    <h4>{icon}{title}{required_text}</h4>
+    <p>{help_text}</p>
+</div>
+"""
 
-.stTabs [aria-selected="true"] {
-    background: linear-gradient(135deg, #1e40af 0%, #1e3a8a 100%);
-    color: white;
-    border-color: #1e40af;
-    box-shadow: 0 4px 15px rgba(30,64,175,0.3);
-}
+@st.cache_data(show_spinner=False)
+def doc_card_html(title: str, tone: str, icon: str, help_text: str, required: bool) -> str:
+    """Rendered DOC_CARD_TEMPLATE; the cards are static, so each is formatted once per process"""
+    return DOC_CARD_TEMPLATE.format(
+        tone=tone,
+        icon=f'<span class="doc-card-icon">{icon}</span> ' if icon else '',
+        title=title,
+        required_text=" *" if required else " (ไม่บังคับ)",
+        help_text=help_text
+    )
 
-/* Smooth animations for all elements */
-* {
-    transition: all 0.2s ease;
-}
+@st.cache_data(show_spinner=False)
+def page_head_html() -> str:
+    """Stylesheet and header joined, so each rerun sends them as one element"""
+    return load_css() + HEADER_HTML
 
-/* Custom scrollbar */
-::-webkit-scrollbar {
-    width: 8px;
-}
+# Custom CSS and header, emitted on every rerun since Streamlit drops elements a run does not re-emit
+st.markdown(page_head_html(), unsafe_allow_html=True)
 
-::-webkit-scrollbar-track {
-    background: #f1f1f1;
-    border-radius: 10px;
-}
+# Session management with URL parameter persistence
+# Check for session_id in URL parameters first
+query_params = st.query_params
+session_id_from_url = query_params.get('session_id', None)
 
-::-webkit-scrollbar-thumb {
-    background: linear-gradient(135deg, #1e40af 0%, #1e3a8a 100%);
-    border-radius: 10px;
-}
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = session_id_from_url
 
-::-webkit-scrollbar-thumb:hover {
-    background: linear-gradient(135deg, #1e3a8a 0%, #1e3a8a 100%);
-}
+if 'current_user' not in st.session_state:
+    st.session_state.current_user = None
 
-/* Button alignment styling for equal size buttons */
-.stButton > button, .stDownloadButton > button {
-    height: 40px !important;
-    min-height: 40px !important;
-    max-height: 40px !important;
-    width: 100% !important;
-    display: flex !important;
-    align-items: center !important;
-    justify-content: center !important;
-    padding: 0.5rem !important;
-    font-size: 1.1rem !important;
-    line-height: 1 !important;
-    border-radius: 8px !important;
-    margin: 0 !important;
-    box-sizing: border-box !important;
-}
+# UI toggles start off; later code reads them as plain attributes
+for flag in UI_FLAGS:
+    if flag not in st.session_state:
+        st.session_state[flag] = False
 
-/* Ensure columns have equal height and alignment */
-.stColumns > div {
-    display: flex !important;
-    align-items: stretch !important;
-    height: 40px !important;
-}
+# If we have a session_id from URL but not in session_state, use it
+if session_id_from_url and not st.session_state.session_id:
+    st.session_state.session_id = session_id_from_url
 
-.stColumns > div > div {
-    display: flex !important;
-    flex-direction: column !important;
-    justify-content: center !important;
-    height: 100% !important;
-}
-
-/* Ensure equal column widths */
-.stColumns [data-testid="column"] {
-    flex: 1 !important;
-    min-width: 0 !important;
-}
-
-/* Apply IBM Plex Sans Thai to all Streamlit components */
-.stApp, .stApp * {
-    font-family: 'IBM Plex Sans Thai', sans-serif !important;
-}
-
-.stMarkdown, .stMarkdown * {
-    font-family: 'IBM Plex Sans Thai', sans-serif !important;
-}
-
-.stText, .stText * {
-    font-family: 'IBM Plex Sans Thai', sans-serif !important;
-}
-
-.stTextInput > div > div > input {
-    font-family: 'IBM Plex Sans Thai', sans-serif !important;
-}
-
-.stSelectbox > div > div > div {
-    font-family: 'IBM Plex Sans Thai', sans-serif !important;
-}
-
-.stButton > button {
-    font-family: 'IBM Plex Sans Thai', sans-serif !important;
-}
-
-.stRadio > div > label {
-    font-family: 'IBM Plex Sans Thai', sans-serif !important;
-}
-
-.stTabs [data-baseweb="tab"] {
-    font-family: 'IBM Plex Sans Thai', sans-serif !important;
-}
-
-h1, h2, h3, h4, h5, h6 {
-    font-family: 'IBM Plex Sans Thai', sans-serif !important;
-}
-
-p, span, div, label, input, select, textarea {
-    font-family: 'IBM Plex Sans Thai', sans-serif !important;
-}
-</style>
-""", unsafe_allow_html=True)
-
-# Simple header with logo
-st.markdown("""
-<div class="main-header">
-    <img src="https://upload.wikimedia.org/wikipedia/th/thumb/b/bb/Informatics_MSU_Logo.svg/1200px-Informatics_MSU_Logo.svg.png" 
-         style="width:80px;height:80px;object-fit:cover;margin:0 auto 1rem auto;display:block;" 
-         onerror="this.style.display='none'; this.nextElementSibling.style.display='block';">
-    <div style="width:60px;height:60px;background:white;color:#1e40af;font-weight:bold;font-size:1.2rem;display:none;margin:0 auto 1rem auto;text-align:center;line-height:60px;border-radius:8px;">MSU</div>
-    <h1>ระบบอัพโหลดเอกสารสมัครเรียน</h1>
-    <h3>มหาวิทยาลัยมหาสารคาม</h3>
-</div>
-""", unsafe_allow_html=True)
-
-# Session management with URL parameter persistence
-# Check for session_id in URL parameters first
-query_params = st.query_params
-session_id_from_url = query_params.get('session_id', None)
-
-if 'session_id' not in st.session_state:
-    st.session_state.session_id = session_id_from_url
-
-if 'current_user' not in st.session_state:
-    st.session_state.current_user = None
-
-# If we have a session_id from URL but not in session_state, use it
-if session_id_from_url and not st.session_state.session_id:
-    st.session_state.session_id = session_id_from_url
-
-# Validate current session
-if st.session_state.session_id:
-    username = AuthManager.validate_session(st.session_state.session_id)
-    if username:
-        st.session_state.current_user = UserManager.get_user(username)
-        # Update URL with session_id to persist across refreshes
-        if 'session_id' not in query_params or query_params['session_id'] != st.session_state.session_id:
-            st.query_params['session_id'] = st.session_state.session_id
-    else:
-        st.session_state.session_id = None
-        st.session_state.current_user = None
-        # Remove session_id from URL if invalid
-        if 'session_id' in query_params:
-            del st.query_params['session_id']
+# Validate current session
+if st.session_state.session_id:
+    username = AuthManager.validate_session(st.session_state.session_id)
+    if username:
+        st.session_state.current_user = get_user_cached(username)
+        # Update URL with session_id to persist across refreshes
+        if 'session_id' not in query_params or query_params['session_id'] != st.session_state.session_id:
+            st.query_params['session_id'] = st.session_state.session_id
+    else:
+        st.session_state.session_id = None
+        st.session_state.current_user = None
+        # Remove session_id from URL if invalid
+        if 'session_id' in query_params:
+            del st.query_params['session_id']
 
 # Main application logic
 if not st.session_state.current_user:
@@ -862,22 +1432,9 @@ if not st.session_state.current_user:
                 st.rerun()
         
         # ฟอร์มลืมรหัสผ่าน
-        if st.session_state.get('show_forgot_password', False):
+        if st.session_state.show_forgot_password:
             st.markdown("---")
-            st.markdown("""
-            <div style="
-                background: #fff3cd;
-                border: 1px solid #ffeaa7;
-                border-radius: 10px;
-                padding: 1.5rem;
-                margin: 1rem 0;
-            ">
-                <h4 style="color: #856404; margin-bottom: 1rem; display: flex; align-items: center;">
-                    ขอรีเซ็ตรหัสผ่าน
-                </h4>
-                <p style="color: #856404; margin: 0;">กรุณากรอกข้อมูลด้านล่างเพื่อส่งคำขอรีเซ็ตรหัสผ่านไปยังผู้ดูแลระบบ</p>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(FORGOT_PASSWORD_BANNER_HTML, unsafe_allow_html=True)
             
             with st.form("forgot_password_form"):
                  st.markdown("**ข้อมูลสำหรับการยืนยันตัวตน**")
@@ -900,9 +1457,10 @@ if not st.session_state.current_user:
                      cancel_forgot = st.form_submit_button("ยกเลิก", use_container_width=True, type="secondary")
                  
                  if submit_forgot:
+                     forgot_citizen_id = forgot_citizen_id.strip()
                      if forgot_username and forgot_first_name and forgot_last_name and forgot_citizen_id:
-                         # ตรวจสอบว่าข้อมูลตรงกับที่ลงทะเบียนไว้หรือไม่
-                         user_data = UserManager.get_user(forgot_username)
+                         # ตรวจสอบว่าข้อมูลตรงกับที่ลงทะเบียนไว้หรือไม่ (เลขบัตรที่ไม่ครบ 13 หลักไม่ต้องค้นหา)
+                         user_data = get_user_cached(forgot_username) if CITIZEN_ID_RE.fullmatch(forgot_citizen_id) else None
                          if (user_data and 
                              user_data.get('citizen_id') == forgot_citizen_id and 
                              user_data.get('first_name') == forgot_first_name and
@@ -919,77 +1477,7 @@ if not st.session_state.current_user:
                              success, msg = MessageManager.send_message(forgot_username, subject, message_content, "password_reset")
                              if success:
                                  st.session_state.password_reset_success = True
-                                 st.markdown("""
-                                 <div style="
-                                     background: linear-gradient(135deg, #10b981 0%, #059669 100%);
-                                     color: white;
-                                     padding: 2rem;
-                                     border-radius: 15px;
-                                     text-align: center;
-                                     margin: 1.5rem 0;
-                                     box-shadow: 0 8px 25px rgba(16, 185, 129, 0.3);
-                                     animation: slideIn 0.6s ease-out;
-                                     border: 1px solid rgba(255, 255, 255, 0.2);
-                                 ">
-                                     <div style="
-                                         width: 80px;
-                                         height: 80px;
-                                         background: rgba(255, 255, 255, 0.2);
-                                         border-radius: 50%;
-                                         margin: 0 auto 1.5rem;
-                                         display: flex;
-                                         align-items: center;
-                                         justify-content: center;
-                                         font-size: 2.5rem;
-                                         animation: pulse 2s infinite;
-                                     ">🔑</div>
-                                     <h3 style="
-                                         margin: 0 0 1rem 0;
-                                         font-size: 1.5rem;
-                                         font-weight: 600;
-                                         text-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                                     ">ส่งคำขอรีเซ็ตรหัสผ่านสำเร็จ!</h3>
-                                     <div style="
-                                         background: rgba(255, 255, 255, 0.15);
-                                         padding: 1.5rem;
-                                         border-radius: 12px;
-                                         margin: 1rem 0;
-                                         backdrop-filter: blur(10px);
-                                     ">
-                                         <p style="
-                                             margin: 0 0 1rem 0;
-                                             font-size: 1.1rem;
-                                             line-height: 1.6;
-                                             opacity: 0.95;
-                                         "><strong>รหัสผ่านใหม่ของคุณจะเป็น:</strong><br>
-                                         <span style="
-                                             font-size: 1.2rem;
-                                             font-weight: 600;
-                                             color: #fef3c7;
-                                             text-shadow: 0 1px 2px rgba(0,0,0,0.2);
-                                         ">เลขบัตรประจำตัวประชาชนของคุณ</span></p>
-                                         <p style="
-                                             margin: 0;
-                                             font-size: 1rem;
-                                             opacity: 0.9;
-                                         ">ผู้ดูแลระบบจะติดต่อกลับภายใน <strong>1-2 วันทำการ</strong></p>
-                                     </div>
-                                     <div style="
-                                         margin-top: 1.5rem;
-                                         padding-top: 1rem;
-                                         border-top: 1px solid rgba(255, 255, 255, 0.2);
-                                         font-size: 0.9rem;
-                                         opacity: 0.8;
-                                     ">
-                                         💡 <em>กรุณาเก็บรักษาข้อมูลนี้ไว้เป็นความลับ</em>
-                                     </div>
-                                 </div>
-                                 """, unsafe_allow_html=True)
-                                 # เพิ่มปุ่มปิดให้ผู้ใช้
-                                 st.markdown("""
-                                 <div style="text-align: center; margin-top: 1rem;">
-                                 </div>
-                                 """, unsafe_allow_html=True)
+                                 st.markdown(PW_RESET_SUCCESS_HTML, unsafe_allow_html=True)
                              else:
                                  st.error(f"เกิดข้อผิดพลาด: {msg}")
                          else:
@@ -1002,7 +1490,7 @@ if not st.session_state.current_user:
                      st.rerun()
             
             # ปุ่มกลับไปหน้าเข้าสู่ระบบ (นอก form)
-            if st.session_state.get('password_reset_success', False):
+            if st.session_state.password_reset_success:
                 col1, col2, col3 = st.columns([1, 2, 1])
                 with col2:
                     if st.button("กลับไปหน้าเข้าสู่ระบบ", key="back_to_login", type="primary", use_container_width=True):
@@ -1038,9 +1526,9 @@ if not st.session_state.current_user:
                     with col1:
                         citizen_id = st.text_input("เลขบัตรประชาชน *", max_chars=13, placeholder="1234567890123")
                         birth_date = st.date_input("วันเดือนปีเกิด *", 
-                                                 min_value=datetime.date(1950, 1, 1),
+                                                 min_value=BIRTH_DATE_MIN,
                                                  max_value=datetime.date.today(),
-                                                 value=datetime.date(2000, 1, 1))
+                                                 value=BIRTH_DATE_DEFAULT)
                     with col2:
                         phone = st.text_input("เบอร์โทรศัพท์ *", max_chars=10, placeholder="0812345678")
                         email = st.text_input("อีเมล *", placeholder="example@email.com")
@@ -1054,14 +1542,14 @@ if not st.session_state.current_user:
                         gpax = st.text_input("เกรดเฉลี่ย (GPAX) *", max_chars=4, placeholder="3.50")
                     with col2:
                         graduation_year = st.selectbox("ปีที่จบการศึกษา *", 
-                                                     options=list(range(2020, 2030)))
+                                                     options=GRAD_YEARS)
                 
                 # ข้อมูลเพิ่มเติม
                 with st.expander("ข้อมูลเพิ่มเติม", expanded=True):
                     col1, col2 = st.columns(2)
                     with col1:
                         address = st.text_area("ที่อยู่(ที่สามารถติดต่อได้)", placeholder="บ้านเลขที่ ถนน ตำบล อำเภอ รหัสไปรษณีย์")
-                        province = st.selectbox("จังหวัด *", options=[""] + THAI_PROVINCES, index=0)
+                        province = st.selectbox("จังหวัด *", options=PROVINCE_OPTIONS, index=0)
                     with col2:
                         parent_name = st.text_input("ชื่อผู้ปกครอง", placeholder="ชื่อ-นามสกุล ผู้ปกครอง")
                         parent_phone = st.text_input("เบอร์ผู้ปกครอง", placeholder="0812345678", max_chars=10)
@@ -1080,25 +1568,19 @@ if not st.session_state.current_user:
                                                 help="ชื่อผู้ใช้ควรมีความยาว 4-20 ตัวอักษร")
                         password = st.text_input("รหัสผ่าน *", 
                                                 type="password", 
+                                                max_chars=MAX_PASSWORD_BYTES,
                                                 placeholder="รหัสผ่านอย่างน้อย 6 ตัวอักษร",
                                                 help="รหัสผ่านควรมีความยาวอย่างน้อย 6 ตัวอักษร")
                         confirm_password = st.text_input("ยืนยันรหัสผ่าน *", 
                                                         type="password",
+                                                        max_chars=MAX_PASSWORD_BYTES,
                                                         placeholder="กรอกรหัสผ่านอีกครั้ง")
                 
                 with login_col2:
-                    st.info("**คำแนะนำ**\n\nกรุณาจดจำชื่อผู้ใช้และรหัสผ่านไว้สำหรับเข้าสู่ระบบ")
+                    st.info(REGISTER_HINT_TEXT)
                     
                     with st.expander("ข้อกำหนด"):
-                        st.markdown("""
-                        **ชื่อผู้ใช้:**
-                        • ความยาว 4-20 ตัวอักษร
-                        • ใช้ได้เฉพาะตัวอักษรและตัวเลข
-                        
-                        **รหัสผ่าน:**
-                        • ความยาวอย่างน้อย 6 ตัวอักษร
-                        • ควรใช้ตัวอักษรและตัวเลขผสมกัน
-                        """)
+                        st.markdown(REGISTER_RULES_TEXT)
                 
 
             
@@ -1108,61 +1590,51 @@ if not st.session_state.current_user:
                 # Validation
                 errors = []
                 
+                # Strip profile inputs once; validators and the saved record use the same values
+                first_name, last_name, citizen_id, phone, email = (
+                    first_name.strip(), last_name.strip(), citizen_id.strip(), phone.strip(), email.strip()
+                )
+                school_name, major, gpax, address, parent_name, parent_phone = (
+                    school_name.strip(), major.strip(), gpax.strip(), address.strip(), parent_name.strip(), parent_phone.strip()
+                )
+                
                 # Required fields
-                required_fields = {
-                    'title': title,
-                    'first_name': first_name,
-                    'last_name': last_name,
-                    'citizen_id': citizen_id,
-                    'birth_date': birth_date,
-                    'phone': phone,
-                    'email': email,
-                    'school_name': school_name,
-                    'major': major,
-                    'gpax': gpax,
-                    'province': province,
-                    'username': username,
-                    'password': password
-                }
+                required_text_fields = (
+                    title, first_name, last_name, citizen_id, phone, email,
+                    school_name, major, gpax, province, username.strip(), password.strip()
+                )
                 
-                for field, value in required_fields.items():
-                    if field == 'birth_date':
-                        if not value:
-                            errors.append("กรุณากรอกข้อมูลที่จำเป็นให้ครบถ้วน")
-                            break
-                    elif field == 'graduation_year':
-                        if not value:
-                            errors.append("กรุณากรอกข้อมูลที่จำเป็นให้ครบถ้วน")
-                            break
-                    else:
-                        if not value or not value.strip():
-                            errors.append("กรุณากรอกข้อมูลที่จำเป็นให้ครบถ้วน")
-                            break
+                if not birth_date or not all(required_text_fields):
+                    errors.append("กรุณากรอกข้อมูลที่จำเป็นให้ครบถ้วน")
                 
                 # Password confirmation
                 if password != confirm_password:
                     errors.append("รหัสผ่านไม่ตรงกัน")
+                elif AuthManager.password_too_long(password):
+                    errors.append(PASSWORD_TOO_LONG_MSG)
                 
                 # Field validations
                 if not errors:
-                    validations = [
-                        Validator.validate_thai_name(first_name),
-                        Validator.validate_thai_name(last_name),
-                        Validator.validate_email(email),
-                        Validator.validate_phone(phone),
-                        Validator.validate_citizen_id_with_uniqueness(citizen_id),
-                        Validator.validate_gpax(gpax)
-                    ]
+                    # Stop at the first failing check; the uniqueness lookup runs last
+                    validations = (
+                        (Validator.validate_thai_name, first_name),
+                        (Validator.validate_thai_name, last_name),
+                        (Validator.validate_email, email),
+                        (Validator.validate_phone, phone),
+                        (Validator.validate_gpax, gpax),
+                        (Validator.validate_citizen_id_with_uniqueness, citizen_id)
+                    )
+                    for validator, value in validations:
+                        is_valid, error_msg = validator(value)
+                        if not is_valid:
+                            errors.append(error_msg)
+                            break
                     
                     # Validate parent phone if provided
-                    if parent_phone and parent_phone.strip():
+                    if not errors and parent_phone:
                         is_valid, error_msg = Validator.validate_phone(parent_phone)
                         if not is_valid:
                             errors.append(f"เบอร์ผู้ปกครอง: {error_msg}")
-                    
-                    for is_valid, error_msg in validations:
-                        if not is_valid:
-                            errors.append(error_msg)
                 
                 if errors:
                     for error in errors:
@@ -1181,7 +1653,7 @@ if not st.session_state.current_user:
                         'email': email,
                         'school_name': school_name,
                         'major': major,
-                        'gpax': round(float(gpax), 2),
+                        'gpax': Validator.parse_gpax(gpax),
                         'graduation_year': graduation_year,
                         'address': address,
                         'province': province,
@@ -1297,7 +1769,7 @@ else:
                 with st.expander("ข้อมูลพื้นฐาน", expanded=True):
                     col1, col2, col3 = st.columns(3)
                     with col1:
-                        student_title = st.selectbox("คำนำหน้า *", options=[""] + THAI_TITLES, index=0)
+                        student_title = st.selectbox("คำนำหน้า *", options=TITLE_OPTIONS, index=0)
                     with col2:
                         student_first_name = st.text_input(
                             "ชื่อ *",
@@ -1323,9 +1795,9 @@ else:
                         )
                         student_birth_date = st.date_input(
                             "วันเดือนปีเกิด *",
-                            min_value=datetime.date(1950, 1, 1),
+                            min_value=BIRTH_DATE_MIN,
                             max_value=datetime.date.today(),
-                            value=datetime.date(2000, 1, 1)
+                            value=BIRTH_DATE_DEFAULT
                         )
                     with col2:
                         student_phone = st.text_input(
@@ -1358,7 +1830,7 @@ else:
                     with col2:
                         student_graduation_year = st.selectbox(
                             "ปีที่จบการศึกษา *",
-                            options=list(range(2020, 2030))
+                            options=GRAD_YEARS
                         )
                 
                 # ข้อมูลเพิ่มเติม
@@ -1371,7 +1843,7 @@ else:
                         )
                         student_province = st.selectbox(
                             "จังหวัด *",
-                            options=[""] + THAI_PROVINCES,
+                            options=PROVINCE_OPTIONS,
                             index=0
                         )
                     with col2:
@@ -1388,75 +1860,18 @@ else:
                 st.markdown("<br>", unsafe_allow_html=True)
                 
                 # Document upload sections with beautiful cards for admin
-                documents = [
-                    {
-                        "title": "1. รูปถ่าย",
-                        "icon": "",
-                        "color": "#dc3545",
-                        "key": "admin_photo_upload",
-                        "types": ['jpg', 'jpeg', 'png'],
-                        "help": "รูปถ่ายหน้าตรง ชัดเจน • JPG, JPEG, PNG • สูงสุด 200MB",
-                        "required": True
-                    },
-                    {
-                        "title": "2. สำเนาบัตรประจำตัวประชาชน",
-                        "icon": "",
-                        "color": "#28a745",
-                        "key": "admin_id_card_upload",
-                        "types": ['pdf', 'jpg', 'jpeg', 'png'],
-                        "help": "สำเนาบัตรประชาชนที่ชัดเจน • PDF, JPG, JPEG, PNG • สูงสุด 200MB",
-                        "required": True
-                    },
-                    {
-                        "title": "3. สำเนาใบแสดงผลการเรียน",
-                        "icon": "",
-                        "color": "#ffc107",
-                        "key": "admin_transcript_upload",
-                        "types": ['pdf', 'jpg', 'jpeg', 'png'],
-                        "help": "ใบแสดงผลการเรียน • PDF, JPG, JPEG, PNG • สูงสุด 200MB",
-                        "required": True
-                    },
-                    {
-                        "title": "4. หลักฐานการเปลี่ยนชื่อ-สกุล หรือหลักฐานอื่นๆ",
-                        "icon": "",
-                        "color": "#6c757d",
-                        "key": "admin_other_upload",
-                        "types": ['pdf', 'jpg', 'jpeg', 'png'],
-                        "help": "เอกสารเพิ่มเติม • PDF, JPG, JPEG, PNG • สูงสุด 200MB",
-                        "required": False
-                    }
-                ]
-                
                 uploaded_files = {}
                 
-                for doc in documents:
+                for doc in ADMIN_UPLOAD_DOCUMENTS:
                     # Create card for each document
-                    required_text = " *" if doc["required"] else " (ไม่บังคับ)"
-                    st.markdown(f"""
-                    <div style="
-                        background: linear-gradient(135deg, {doc['color']}15 0%, {doc['color']}05 100%);
-                        padding: 1.5rem;
-                        border-radius: 15px;
-                        border-left: 4px solid {doc['color']};
-                        margin-bottom: 1.5rem;
-                        box-shadow: 0 4px 15px rgba(0,0,0,0.05);
-                    ">
-                        <h4 style="color: {doc['color']}; margin-bottom: 1rem; display: flex; align-items: center; font-size: 1.2rem;">
-                            <span style="margin-right: 0.8rem; font-size: 1.4rem;">{doc['icon']}</span> 
-                            {doc['title']}{required_text}
-                        </h4>
-                        <p style="color: #6c757d; margin-bottom: 1rem; font-size: 0.9rem; line-height: 1.5;">
-                            {doc['help']}
-                        </p>
-                    </div>
-                    """, unsafe_allow_html=True)
+                    st.markdown(doc_card_html(doc.title, doc.tone, doc.icon, doc.help, doc.required), unsafe_allow_html=True)
                     
                     # File uploader
-                    uploaded_files[doc['key']] = st.file_uploader(
-                        f"เลือกไฟล์สำหรับ {doc['title']}",
-                        type=doc['types'],
-                        help=doc['help'],
-                        key=doc['key'],
+                    uploaded_files[doc.key] = st.file_uploader(
+                        f"เลือกไฟล์สำหรับ {doc.title}",
+                        type=doc.types,
+                        help=doc.help,
+                        key=doc.key,
                         label_visibility="collapsed"
                     )
                     
@@ -1480,65 +1895,77 @@ else:
                     # Validate student information
                     validation_errors = []
                     
+                    # Strip text inputs once; checks, file names and the student record reuse them
+                    student_citizen_id, student_first_name, student_last_name = (
+                        student_citizen_id.strip(), student_first_name.strip(), student_last_name.strip()
+                    )
+                    student_email, student_phone, student_gpax = (
+                        student_email.strip(), student_phone.strip(), student_gpax.strip()
+                    )
+                    student_school_name, student_major, student_address = (
+                        student_school_name.strip(), student_major.strip(), student_address.strip()
+                    )
+                    student_parent_name, student_parent_phone = student_parent_name.strip(), student_parent_phone.strip()
+                    
                     # Validate required fields
-                    if not student_citizen_id or len(student_citizen_id.strip()) != 13:
-                        validation_errors.append("กรุณากรอกเลขบัตรประชาชนนักเรียนให้ครบ 13 หลัก")
-                    elif not student_citizen_id.isdigit():
-                        validation_errors.append("เลขบัตรประชาชนต้องเป็นตัวเลขเท่านั้น")
+                    if not CITIZEN_ID_RE.fullmatch(student_citizen_id):
+                        if len(student_citizen_id) != 13:
+                            validation_errors.append("กรุณากรอกเลขบัตรประชาชนนักเรียนให้ครบ 13 หลัก")
+                        else:
+                            validation_errors.append("เลขบัตรประชาชนต้องเป็นตัวเลขเท่านั้น")
                     
                     if not student_title:
                         validation_errors.append("กรุณาเลือกคำนำหน้านักเรียน")
                     
-                    if not student_first_name or not student_first_name.strip():
+                    if not student_first_name:
                         validation_errors.append("กรุณากรอกชื่อนักเรียน")
                     
-                    if not student_last_name or not student_last_name.strip():
+                    if not student_last_name:
                         validation_errors.append("กรุณากรอกนามสกุลนักเรียน")
                     
                     if not student_birth_date:
                         validation_errors.append("กรุณาเลือกวันเกิดนักเรียน")
                     
-                    if not student_email or not student_email.strip():
+                    if not student_email:
                         validation_errors.append("กรุณากรอกอีเมลนักเรียน")
-                    elif "@" not in student_email:
-                        validation_errors.append("รูปแบบอีเมลไม่ถูกต้อง")
+                    else:
+                        is_valid, error_msg = Validator.validate_email(student_email)
+                        if not is_valid:
+                            validation_errors.append(error_msg)
                     
-                    if not student_phone or not student_phone.strip():
+                    if not student_phone:
                         validation_errors.append("กรุณากรอกเบอร์โทรศัพท์นักเรียน")
-                    elif not student_phone.isdigit() or len(student_phone) != 10:
+                    elif not TEN_DIGITS_RE.fullmatch(student_phone):
                         validation_errors.append("เบอร์โทรศัพท์ต้องเป็นตัวเลข 10 หลัก")
                     
-                    if not student_school_name or not student_school_name.strip():
+                    if not student_school_name:
                         validation_errors.append("กรุณากรอกสถาบันการศึกษาที่จบ")
                     
-                    if not student_major or not student_major.strip():
+                    if not student_major:
                         validation_errors.append("กรุณากรอกสาขาวิชาที่จบ")
                     
-                    if not student_gpax or not student_gpax.strip():
+                    if not student_gpax:
                         validation_errors.append("กรุณากรอกเกรดเฉลี่ยนักเรียน")
                     else:
-                        try:
-                            gpax_value = float(student_gpax)
-                            if gpax_value < 0 or gpax_value > 4:
-                                validation_errors.append("เกรดเฉลี่ยต้องอยู่ระหว่าง 0.00 - 4.00")
-                        except ValueError:
-                            validation_errors.append("เกรดเฉลี่ยต้องเป็นตัวเลข")
+                        is_valid, error_msg = Validator.validate_gpax(student_gpax)
+                        if not is_valid:
+                            validation_errors.append(error_msg)
                     
                     if not student_graduation_year:
                         validation_errors.append("กรุณาเลือกปีที่จบการศึกษานักเรียน")
                     
-                    if not student_address or not student_address.strip():
+                    if not student_address:
                         validation_errors.append("กรุณากรอกที่อยู่นักเรียน")
                     
                     if not student_province:
                         validation_errors.append("กรุณาเลือกจังหวัดนักเรียน")
                     
-                    if not student_parent_name or not student_parent_name.strip():
+                    if not student_parent_name:
                         validation_errors.append("กรุณากรอกชื่อผู้ปกครองนักเรียน")
                     
-                    if not student_parent_phone or not student_parent_phone.strip():
+                    if not student_parent_phone:
                         validation_errors.append("กรุณากรอกเบอร์โทรศัพท์ผู้ปกครองนักเรียน")
-                    elif not student_parent_phone.isdigit() or len(student_parent_phone) != 10:
+                    elif not TEN_DIGITS_RE.fullmatch(student_parent_phone):
                         validation_errors.append("เบอร์โทรศัพท์ผู้ปกครองต้องเป็นตัวเลข 10 หลัก")
                     
                     # Check required documents
@@ -1557,70 +1984,70 @@ else:
                         st.error(f"กรุณาอัพโหลดเอกสารที่จำเป็น: {', '.join(missing_files)}")
                     else:
                         # Process all uploaded files for admin
-                        uploaded_files_list = [
-                            (admin_photo_file, "รูปถ่าย"),
-                            (admin_id_card_file, "สำเนาบัตรประจำตัวประชาชน"),
-                            (admin_transcript_file, "สำเนาใบแสดงผลการเรียน")
-                        ]
-                        
-                        # Add optional file if uploaded
-                        if admin_other_file is not None:
-                            uploaded_files_list.append((admin_other_file, "หลักฐานการเปลี่ยนชื่อ-สกุล"))
+                        uploaded_files_list = tuple(
+                            (f, t) for f, t in (
+                                (admin_photo_file, "รูปถ่าย"),
+                                (admin_id_card_file, "สำเนาบัตรประจำตัวประชาชน"),
+                                (admin_transcript_file, "สำเนาใบแสดงผลการเรียน"),
+                                (admin_other_file, "หลักฐานการเปลี่ยนชื่อ-สกุล")
+                            ) if f is not None
+                        )
                         
                         success_count = 0
+                        upload_log_lines = []
                         error_messages = []
+                        now_iso = datetime.datetime.now().isoformat()
+                        student_info = f"{student_title} {student_first_name} {student_last_name} (ID: {student_citizen_id})"
+                        # Every file for this student shares this prefix; only the document type and extension vary
+                        safe_name = f"{student_first_name}-{student_last_name}".replace(' ', '-')
+                        student_file_prefix = f"{student_citizen_id}_{safe_name}_"
                         
                         # Remove all existing files for this student before uploading new ones
                         try:
-                            safe_name = f"{student_first_name.strip()}-{student_last_name.strip()}".replace(' ', '-')
-                            student_file_prefix = f"{student_citizen_id.strip()}_{safe_name}_"
-                            
                             # Find and remove all files that belong to this student
-                            for existing_file in os.listdir(UPLOAD_DIR):
-                                if existing_file.startswith(student_file_prefix):
-                                    existing_file_path = os.path.join(UPLOAD_DIR, existing_file)
-                                    try:
-                                        os.remove(existing_file_path)
-                                        # Log file removal with student information
-                                        student_info = f"{student_title} {student_first_name.strip()} {student_last_name.strip()} (ID: {student_citizen_id.strip()})"
-                                        log_entry = f"{datetime.datetime.now().isoformat()} - Old student file removed by admin {user['username']} for student {student_info}: {existing_file}\n"
-                                        with open(os.path.join(LOG_DIR, 'user_changes.log'), 'a', encoding='utf-8') as f:
-                                            f.write(log_entry)
-                                    except Exception as e:
-                                        error_messages.append(f"ไม่สามารถลบไฟล์เก่า {existing_file} ได้: {str(e)}")
+                            for existing_file, error in DataManager.remove_uploads(student_file_prefix):
+                                if error is not None:
+                                    error_messages.append(f"ไม่สามารถลบไฟล์เก่า {existing_file} ได้: {str(error)}")
+                                    continue
+                                # Log file removal with student information
+                                upload_log_lines.append(f"{now_iso} - Old student file removed by admin {user['username']} for student {student_info}: {existing_file}\n")
                         except Exception as e:
                             error_messages.append(f"เกิดข้อผิดพลาดในการตรวจสอบไฟล์เก่า: {str(e)}")
                         
+                        upload_jobs = []
                         for uploaded_file, doc_type in uploaded_files_list:
-                            if uploaded_file is not None:
-                                try:
-                                    # Generate filename according to convention using student info
-                                    file_extension = uploaded_file.name.split('.')[-1]
-                                    safe_name = f"{student_first_name.strip()}-{student_last_name.strip()}".replace(' ', '-')
-                                    safe_doc_type = doc_type.replace(' ', '-').replace('/', '-')
-                                    
-                                    filename = f"{student_citizen_id.strip()}_{safe_name}_{safe_doc_type}.{file_extension}"
-                                    file_path = os.path.join(UPLOAD_DIR, filename)
-                                    
-                                    # Check file size (200MB limit)
-                                    if uploaded_file.size > 200 * 1024 * 1024:
-                                        error_messages.append(f"{doc_type}: ไฟล์มีขนาดเกิน 200MB")
-                                        continue
-                                    
-                                    # Save file
-                                    with open(file_path, 'wb') as f:
-                                        f.write(uploaded_file.getbuffer())
-                                    
-                                    success_count += 1
-                                    
-                                    # Log upload with complete student information
-                                    student_info = f"{student_title} {student_first_name.strip()} {student_last_name.strip()} (ID: {student_citizen_id.strip()})"
-                                    log_entry = f"{datetime.datetime.now().isoformat()} - Admin file uploaded by {user['username']} for student {student_info}: {filename}\n"
-                                    with open(os.path.join(LOG_DIR, 'user_changes.log'), 'a', encoding='utf-8') as f:
-                                        f.write(log_entry)
-                                    
-                                except Exception as e:
-                                    error_messages.append(f"{doc_type}: {str(e)}")
+                            # Check file size (200MB limit) before any other work
+                            if uploaded_file.size > MAX_UPLOAD_SIZE:
+                                error_messages.append(f"{doc_type}: ไฟล์มีขนาดเกิน 200MB")
+                                continue
+                            
+                            # Generate filename according to convention using student info
+                            file_extension = uploaded_file.name.rpartition('.')[2]
+                            safe_doc_type = doc_type.translate(FILENAME_SAFE_TABLE)
+                            
+                            filename = f"{student_file_prefix}{safe_doc_type}.{file_extension}"
+                            upload_jobs.append((doc_type, filename, uploaded_file))
+                        
+                        # Save files in parallel, reporting progress as each one lands
+                        save_progress = st.progress(0.0)
+                        save_errors = DataManager.save_uploads(
+                            [(uploaded_file, os.path.join(UPLOAD_DIR, filename)) for _, filename, uploaded_file in upload_jobs],
+                            on_progress=save_progress.progress
+                        )
+                        save_progress.empty()
+                        
+                        for (doc_type, filename, _), error in zip(upload_jobs, save_errors):
+                            if error is not None:
+                                error_messages.append(f"{doc_type}: {str(error)}")
+                                continue
+                            
+                            success_count += 1
+                            
+                            # Log upload with complete student information
+                            upload_log_lines.append(f"{now_iso} - Admin file uploaded by {user['username']} for student {student_info}: {filename}\n")
+                        
+                        if upload_log_lines:
+                            LOG_WRITER.append(os.path.join(LOG_DIR, 'user_changes.log'), ''.join(upload_log_lines))
                         
                         # Show results
                         if success_count > 0:
@@ -1629,10 +2056,10 @@ else:
                             # Add student information to users.json
                             try:
                                 # Generate username from citizen ID
-                                student_username = f"student_{student_citizen_id.strip()}"
+                                student_username = f"student_{student_citizen_id}"
                                 
                                 # Generate a default password (can be changed later)
-                                default_password = f"{student_citizen_id.strip()}@{student_birth_date.year}"
+                                default_password = f"{student_citizen_id}@{student_birth_date.year}"
                                 hashed_password = AuthManager.hash_password(default_password)
                                 
                                 # Prepare student data
@@ -1641,45 +2068,49 @@ else:
                                     "password": hashed_password,
                                     "role": "user",
                                     "title": student_title,
-                                    "first_name": student_first_name.strip(),
-                                    "last_name": student_last_name.strip(),
-                                    "email": student_email.strip(),
-                                    "phone": student_phone.strip(),
-                                    "citizen_id": student_citizen_id.strip(),
+                                    "first_name": student_first_name,
+                                    "last_name": student_last_name,
+                                    "email": student_email,
+                                    "phone": student_phone,
+                                    "citizen_id": student_citizen_id,
                                     "birth_date": student_birth_date.isoformat(),
-                                    "school_name": student_school_name.strip(),
-                                    "major": student_major.strip(),
-                                    "gpax": student_gpax.strip(),
+                                    "school_name": student_school_name,
+                                    "major": student_major,
+                                    "gpax": Validator.parse_gpax(student_gpax),
                                     "graduation_year": student_graduation_year,
-                                    "address": student_address.strip(),
+                                    "address": student_address,
                                     "province": student_province,
-                                    "parent_name": student_parent_name.strip(),
-                                    "parent_phone": student_parent_phone.strip(),
+                                    "parent_name": student_parent_name,
+                                    "parent_phone": student_parent_phone,
                                     "created_at": datetime.datetime.now().isoformat(),
                                     "created_by_admin": user['username']
                                 }
                                 
-                                # Load existing users
-                                users = DataManager.load_json(USERS_FILE, {})
+                                # Load, upsert and save under the users.json lock so concurrent writes are not lost
+                                with get_file_lock(USERS_FILE):
+                                    users = DataManager.load_json(USERS_FILE, {})
+                                    
+                                    # Check if student already exists
+                                    student_exists = student_username in users
+                                    if student_exists:
+                                        # Update existing student data
+                                        users[student_username].update(student_data)
+                                    else:
+                                        # Add new student
+                                        users[student_username] = student_data
+                                    
+                                    # Save updated users data
+                                    DataManager.save_json(USERS_FILE, users)
+                                get_user_cached.clear()
                                 
-                                # Check if student already exists
-                                if student_username in users:
-                                    # Update existing student data
-                                    users[student_username].update(student_data)
+                                if student_exists:
                                     st.info(f"อัพเดทข้อมูลนักเรียน: {student_title} {student_first_name} {student_last_name}")
                                 else:
-                                    # Add new student
-                                    users[student_username] = student_data
                                     st.success(f"เพิ่มข้อมูลนักเรียนใหม่: {student_title} {student_first_name} {student_last_name}")
                                 
-                                # Save updated users data
-                                DataManager.save_json(USERS_FILE, users)
-                                
                                 # Log student creation/update
-                                student_info = f"{student_title} {student_first_name.strip()} {student_last_name.strip()} (ID: {student_citizen_id.strip()})"
-                                log_entry = f"{datetime.datetime.now().isoformat()} - Student account created/updated by admin {user['username']} for {student_info} (username: {student_username})\n"
-                                with open(os.path.join(LOG_DIR, 'user_changes.log'), 'a', encoding='utf-8') as f:
-                                    f.write(log_entry)
+                                log_entry = f"{now_iso} - Student account created/updated by admin {user['username']} for {student_info} (username: {student_username})\n"
+                                LOG_WRITER.append(os.path.join(LOG_DIR, 'user_changes.log'), log_entry)
                                 
                                 # Show login credentials
                                 st.info(f"ข้อมูลการเข้าสู่ระบบของนักเรียน:\n- ชื่อผู้ใช้: {student_username}\n- รหัสผ่านเริ่มต้น: {default_password}")
@@ -1725,611 +2156,498 @@ else:
                 </div>
                 """, unsafe_allow_html=True)
                 
-                if os.path.exists(UPLOAD_DIR):
-                    files = [f for f in os.listdir(UPLOAD_DIR) if os.path.isfile(os.path.join(UPLOAD_DIR, f))]
+                students_data = build_student_documents(os.stat(UPLOAD_DIR).st_mtime_ns)
+                
+                if students_data:
+                    # Statistics cards removed - now displayed only in user_tab1
                     
-                    if files:
-                        # Group files by student
-                        students_data = {}
-                        required_docs = ['photo', 'id-card', 'transcript']
-                        doc_type_map = {
-                            'photo': 'รูปถ่าย',
-                            'id-card': 'สำเนาบัตรประจำตัวประชาชน', 
-                            'transcript': 'สำเนาใบแสดงผลการเรียน',
-                            'name-change': 'หลักฐานการเปลี่ยนชื่อ-สกุล',
-                            'other': 'เอกสารอื่นๆ'
-                        }
-                        
-                        for filename in files:
-                            parts = filename.split('_')
-                            if len(parts) >= 3:
-                                citizen_id = parts[0]
-                                student_name = parts[1].replace('-', ' ')
-                                doc_type = parts[2].split('.')[0]
-                                
-                                if citizen_id not in students_data:
-                                    students_data[citizen_id] = {
-                                        'name': student_name,
-                                        'files': [],
-                                        'has_photo': False,
-                                        'has_id_card': False,
-                                        'has_transcript': False,
-                                        'has_name_change': False,
-                                        'other_docs': 0
-                                    }
-                                
-                                file_path = os.path.join(UPLOAD_DIR, filename)
-                                stat = os.stat(file_path)
-                                
-                                students_data[citizen_id]['files'].append({
-                                    'filename': filename,
-                                    'doc_type': doc_type,
-                                    'doc_type_thai': doc_type_map.get(doc_type, doc_type),
-                                    'size_kb': round(stat.st_size / 1024, 2),
-                                    'upload_date': datetime.datetime.fromtimestamp(stat.st_mtime).strftime('%d/%m/%Y %H:%M')
-                                })
-                                
-                                # Track document completeness
-                                if doc_type == 'รูปถ่าย':
-                                    students_data[citizen_id]['has_photo'] = True
-                                elif doc_type == 'สำเนาบัตรประจำตัวประชาชน':
-                                    students_data[citizen_id]['has_id_card'] = True
-                                elif doc_type == 'สำเนาใบแสดงผลการเรียน':
-                                    students_data[citizen_id]['has_transcript'] = True
-                                elif doc_type == 'หลักฐานการเปลี่ยนชื่อ-สกุล':
-                                    students_data[citizen_id]['has_name_change'] = True
-                                else:
-                                    students_data[citizen_id]['other_docs'] += 1
-                        
-                        # Statistics cards removed - now displayed only in user_tab1
+                    # Filter options with beautiful card design
+                    st.markdown("""
+                    <div style="
+                        background: #f8f9fa;
+                        padding: 1.5rem;
+                        border-radius: 15px;
+                        border-left: 4px solid #17a2b8;
+                        margin: 1.5rem 0;
+                        box-shadow: 0 2px 10px rgba(0,0,0,0.05);
+                    ">
+                        <h4 style="color: #17a2b8; margin-bottom: 1rem; display: flex; align-items: center;">
+                            ตัวกรองและการค้นหา
+                        </h4>
+                    </div>
+                    """, unsafe_allow_html=True)
+                    
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        search_student = st.text_input("ค้นหาชื่อนักเรียนหรือเลขบัตรประจำตัวประชาชน", placeholder="พิมพ์ชื่อนักเรียนหรือเลขบัตรประจำตัวประชาชน...")
+                    with col2:
+                        status_filter = st.selectbox("กรองตามสถานะ", ['ทั้งหมด', 'เอกสารครบถ้วน', 'เอกสารไม่ครบ'])
+                    
+                    # Display students
+                    filtered_students = list(students_data.items())
+                    # Apply search filter - search both name and citizen ID
+                    if search_student:
+                        search_term = search_student.lower()
+                        filtered_students = [
+                            (citizen_id, data) for citizen_id, data in filtered_students
+                            if search_term in data['name_lower'] or search_term in citizen_id
+                        ]
+                    
+                    # Apply status filter
+                    if status_filter != 'ทั้งหมด':
+                        want_complete = status_filter == 'เอกสารครบถ้วน'
+                        filtered_students = [
+                            (citizen_id, data) for citizen_id, data in filtered_students
+                            if data['is_complete'] == want_complete
+                        ]
+                    
+                    # Pagination setup
+                    students_per_page = 10
+                    total_students = len(filtered_students)
+                    total_pages = (total_students + students_per_page - 1) // students_per_page if total_students > 0 else 1
+                    
+                    # Initialize page number in session state
+                    if 'current_page' not in st.session_state:
+                        st.session_state.current_page = 1
+                    
+                    # Ensure current page is within valid range
+                    if st.session_state.current_page > total_pages:
+                        st.session_state.current_page = total_pages
+                    if st.session_state.current_page < 1:
+                        st.session_state.current_page = 1
+                    
+                    # Student List Header with pagination info
+                    if filtered_students:
+                        # Calculate pagination
+                        start_idx = (st.session_state.current_page - 1) * students_per_page
+                        end_idx = start_idx + students_per_page
+                        current_page_students = filtered_students[start_idx:end_idx]
                         
-                        # Filter options with beautiful card design
-                        st.markdown("""
+                        # Student List Header with pagination info
+                        st.markdown(f"""
                         <div style="
                             background: #f8f9fa;
                             padding: 1.5rem;
                             border-radius: 15px;
-                            border-left: 4px solid #17a2b8;
+                            border-left: 4px solid #6c757d;
                             margin: 1.5rem 0;
                             box-shadow: 0 2px 10px rgba(0,0,0,0.05);
                         ">
-                            <h4 style="color: #17a2b8; margin-bottom: 1rem; display: flex; align-items: center;">
-                                ตัวกรองและการค้นหา
-                            </h4>
+                            <div style="display: flex; justify-content: space-between; align-items: center; flex-wrap: wrap; gap: 1rem;">
+                                <h4 style="color: #6c757d; margin: 0; display: flex; align-items: center;">
+                                    รายชื่อนักเรียน
+                                </h4>
+                                <div style="color: #6c757d; font-size: 0.9rem;">
+                                    หน้า {st.session_state.current_page} จาก {total_pages} | แสดง {len(current_page_students)} จาก {total_students} คน
+                                </div>
+                            </div>
                         </div>
                         """, unsafe_allow_html=True)
                         
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            search_student = st.text_input("ค้นหาชื่อนักเรียนหรือเลขบัตรประจำตัวประชาชน", placeholder="พิมพ์ชื่อนักเรียนหรือเลขบัตรประจำตัวประชาชน...")
-                        with col2:
-                            status_filter = st.selectbox("กรองตามสถานะ", ['ทั้งหมด', 'เอกสารครบถ้วน', 'เอกสารไม่ครบ'])
-                        
-                        # Display students
-                        filtered_students = []
-                        for citizen_id, data in students_data.items():
-                            # Apply search filter - search both name and citizen ID
-                            if search_student:
-                                search_term = search_student.lower()
-                                if (search_term not in data['name'].lower() and 
-                                    search_term not in citizen_id):
-                                    continue
+                        # Pagination controls
+                        if total_pages > 1:
+                            col1, col2, col3, col4, col5 = st.columns([1, 1, 2, 1, 1])
                             
-                            # Apply status filter
-                            is_complete = data['has_photo'] and data['has_id_card'] and data['has_transcript']
-                            if status_filter == 'เอกสารครบถ้วน' and not is_complete:
-                                continue
-                            elif status_filter == 'เอกสารไม่ครบ' and is_complete:
-                                continue
+                            with col1:
+                                if st.button("หน้าแรก", disabled=(st.session_state.current_page == 1), use_container_width=True):
+                                    st.session_state.current_page = 1
+                                    st.rerun()
                             
-                            filtered_students.append((citizen_id, data))
-                        
-                        # Pagination setup
-                        students_per_page = 10
-                        total_students = len(filtered_students)
-                        total_pages = (total_students + students_per_page - 1) // students_per_page if total_students > 0 else 1
-                        
-                        # Initialize page number in session state
-                        if 'current_page' not in st.session_state:
-                            st.session_state.current_page = 1
-                        
-                        # Ensure current page is within valid range
-                        if st.session_state.current_page > total_pages:
-                            st.session_state.current_page = total_pages
-                        if st.session_state.current_page < 1:
-                            st.session_state.current_page = 1
+                            with col2:
+                                if st.button("ก่อนหน้า", disabled=(st.session_state.current_page == 1), use_container_width=True):
+                                    st.session_state.current_page -= 1
+                                    st.rerun()
+                            
+                            with col3:
+                                # Page selector
+                                page_options = list(range(1, total_pages + 1))
+                                selected_page = st.selectbox(
+                                    "เลือกหน้า:",
+                                    page_options,
+                                    index=st.session_state.current_page - 1,
+                                    key="page_selector"
+                                )
+                                if selected_page != st.session_state.current_page:
+                                    st.session_state.current_page = selected_page
+                                    st.rerun()
+                            
+                            with col4:
+                                if st.button("ถัดไป", disabled=(st.session_state.current_page == total_pages), use_container_width=True):
+                                    st.session_state.current_page += 1
+                                    st.rerun()
+                            
+                            with col5:
+                                if st.button("หน้าสุดท้าย", disabled=(st.session_state.current_page == total_pages), use_container_width=True):
+                                    st.session_state.current_page = total_pages
+                                    st.rerun()
                         
-                        # Student List Header with pagination info
-                        if filtered_students:
-                            # Calculate pagination
-                            start_idx = (st.session_state.current_page - 1) * students_per_page
-                            end_idx = start_idx + students_per_page
-                            current_page_students = filtered_students[start_idx:end_idx]
+                        # Display students for current page
+                        for citizen_id, data in current_page_students:
+                            is_complete = data['is_complete']
+                            status_color = "#28a745" if is_complete else "#dc3545"
+                            status_text = "ครบถ้วน" if is_complete else "ไม่ครบ"
+                            status_bg = "linear-gradient(135deg, #28a745 0%, #20c997 100%)" if is_complete else "linear-gradient(135deg, #dc3545 0%, #c82333 100%)"
+                            
+                            # Prepare document status lists
+                            complete_docs = []
+                            missing_docs = []
+                            
+                            # Check each required document
+                            if data['has_photo']:
+                                complete_docs.append("รูปถ่าย")
+                            else:
+                                missing_docs.append("รูปถ่าย")
+                                
+                            if data['has_id_card']:
+                                complete_docs.append("สำเนาบัตรประจำตัวประชาชน")
+                            else:
+                                missing_docs.append("สำเนาบัตรประจำตัวประชาชน")
+                                
+                            if data['has_transcript']:
+                                complete_docs.append("สำเนาใบแสดงผลการเรียน")
+                            else:
+                                missing_docs.append("สำเนาใบแสดงผลการเรียน")
+                            
+                            # Optional documents
+                            if data['has_name_change']:
+                                complete_docs.append("หลักฐานการเปลี่ยนชื่อ-สกุล")
+                            
+                            if data['other_docs'] > 0:
+                                complete_docs.append(f"เอกสารอื่นๆ ({data['other_docs']} ไฟล์)")
+                            
+                            # Create document status text
+                            complete_text = ", ".join(complete_docs) if complete_docs else "ไม่มี"
+                            missing_text = ", ".join(missing_docs) if missing_docs else "ไม่มี"
                             
-                            # Student List Header with pagination info
+                            # Create missing documents section HTML - DISABLED
+                            # missing_section = ""
+                            # if missing_docs:
+                            #     missing_section = f'''
+                            #     <div style="margin-top: 1rem;">
+                            #         <h5 style="color: #dc3545; margin: 0 0 0.5rem 0; font-size: 1rem; display: flex; align-items: center;">
+                            #             <span style="margin-right: 0.5rem;">❌</span> เอกสารที่ขาด:
+                            #         </h5>
+                            #         <p style="margin: 0; color: #666; font-size: 0.9rem; line-height: 1.4;">{missing_text}</p>
+                            #     </div>
+                            #     '''
+                            missing_section = ""  # Always empty to hide missing documents section
+                            
+                            # Student Card Header with document details (Compact version)
                             st.markdown(f"""
                             <div style="
-                                background: #f8f9fa;
-                                padding: 1.5rem;
-                                border-radius: 15px;
-                                border-left: 4px solid #6c757d;
-                                margin: 1.5rem 0;
-                                box-shadow: 0 2px 10px rgba(0,0,0,0.05);
+                                background: {status_bg};
+                                padding: 0.6rem 1rem;
+                                border-radius: 10px 10px 0 0;
+                                color: white;
+                                margin-top: 0.8rem;
+                                box-shadow: 0 2px 8px rgba(0,0,0,0.08);
                             ">
-                                <div style="display: flex; justify-content: space-between; align-items: center; flex-wrap: wrap; gap: 1rem;">
-                                    <h4 style="color: #6c757d; margin: 0; display: flex; align-items: center;">
-                                        รายชื่อนักเรียน
-                                    </h4>
-                                    <div style="color: #6c757d; font-size: 0.9rem;">
-                                        หน้า {st.session_state.current_page} จาก {total_pages} | แสดง {len(current_page_students)} จาก {total_students} คน
+                                <div style="display: flex; align-items: center; justify-content: space-between;">
+                                    <div>
+                                        <h4 style="margin: 0; font-size: 1rem; font-weight: 600;">{data['name']}</h4>
+                                        <p style="margin: 0.2rem 0 0 0; opacity: 0.9; font-size: 0.75rem;">เลขบัตรประจำตัวประชาชน: {citizen_id}</p>
+                                    </div>
+                                    <div style="text-align: right;">
+                                        <span style="font-size: 0.9rem; font-weight: 600;">{status_text}</span>
                                     </div>
                                 </div>
                             </div>
+                            
+                            <div style="
+                                background: white;
+                                padding: 0.8rem;
+                                border-radius: 0 0 10px 10px;
+                                box-shadow: 0 2px 8px rgba(0,0,0,0.08);
+                                margin-bottom: 0.6rem;
+                            ">
+                                <div style="margin-bottom: 0.5rem;">
+                                    <h5 style="color: #28a745; margin: 0 0 0.3rem 0; font-size: 0.85rem; display: flex; align-items: center;">
+                                        เอกสารที่ครบ:
+                                    </h5>
+                                    <p style="margin: 0; color: #666; font-size: 0.75rem; line-height: 1.3;">{complete_text}</p>
+                                </div>
+                            </div>
                             """, unsafe_allow_html=True)
                             
-                            # Pagination controls
-                            if total_pages > 1:
-                                col1, col2, col3, col4, col5 = st.columns([1, 1, 2, 1, 1])
+                            with st.expander("ดูรายละเอียดเอกสาร", expanded=False):
+                                # สรุปสถานะเอกสารแบบเรียบง่าย
+                                col1, col2 = st.columns([2, 1])
                                 
                                 with col1:
-                                    if st.button("หน้าแรก", disabled=(st.session_state.current_page == 1), use_container_width=True):
-                                        st.session_state.current_page = 1
-                                        st.rerun()
-                                
-                                with col2:
-                                    if st.button("ก่อนหน้า", disabled=(st.session_state.current_page == 1), use_container_width=True):
-                                        st.session_state.current_page -= 1
-                                        st.rerun()
-                                
-                                with col3:
-                                    # Page selector
-                                    page_options = list(range(1, total_pages + 1))
-                                    selected_page = st.selectbox(
-                                        "เลือกหน้า:",
-                                        page_options,
-                                        index=st.session_state.current_page - 1,
-                                        key="page_selector"
-                                    )
-                                    if selected_page != st.session_state.current_page:
-                                        st.session_state.current_page = selected_page
-                                        st.rerun()
-                                
-                                with col4:
-                                    if st.button("ถัดไป", disabled=(st.session_state.current_page == total_pages), use_container_width=True):
-                                        st.session_state.current_page += 1
-                                        st.rerun()
-                                
-                                with col5:
-                                    if st.button("หน้าสุดท้าย", disabled=(st.session_state.current_page == total_pages), use_container_width=True):
-                                        st.session_state.current_page = total_pages
-                                        st.rerun()
-                            
-                            # Display students for current page
-                            for citizen_id, data in current_page_students:
-                                is_complete = data['has_photo'] and data['has_id_card'] and data['has_transcript']
-                                status_color = "#28a745" if is_complete else "#dc3545"
-                                status_text = "ครบถ้วน" if is_complete else "ไม่ครบ"
-                                status_bg = "linear-gradient(135deg, #28a745 0%, #20c997 100%)" if is_complete else "linear-gradient(135deg, #dc3545 0%, #c82333 100%)"
-                                
-                                # Prepare document status lists
-                                complete_docs = []
-                                missing_docs = []
-                                
-                                # Check each required document
-                                if data['has_photo']:
-                                    complete_docs.append("รูปถ่าย")
-                                else:
-                                    missing_docs.append("รูปถ่าย")
+                                    # แสดงสถานะเอกสารจำเป็นในรูปแบบ checklist
+                                    st.markdown("**เอกสารจำเป็น:**")
                                     
-                                if data['has_id_card']:
-                                    complete_docs.append("สำเนาบัตรประจำตัวประชาชน")
-                                else:
-                                    missing_docs.append("สำเนาบัตรประจำตัวประชาชน")
+                                    # รูปถ่าย
+                                    photo_icon = "✓" if data['has_photo'] else "✗"
+                                    st.markdown(f"{photo_icon} รูปถ่าย")
                                     
-                                if data['has_transcript']:
-                                    complete_docs.append("สำเนาใบแสดงผลการเรียน")
-                                else:
-                                    missing_docs.append("สำเนาใบแสดงผลการเรียน")
-                                
-                                # Optional documents
-                                if data['has_name_change']:
-                                    complete_docs.append("หลักฐานการเปลี่ยนชื่อ-สกุล")
-                                
-                                if data['other_docs'] > 0:
-                                    complete_docs.append(f"เอกสารอื่นๆ ({data['other_docs']} ไฟล์)")
-                                
-                                # Create document status text
-                                complete_text = ", ".join(complete_docs) if complete_docs else "ไม่มี"
-                                missing_text = ", ".join(missing_docs) if missing_docs else "ไม่มี"
+                                    # บัตรประชาชน
+                                    id_icon = "✓" if data['has_id_card'] else "✗"
+                                    st.markdown(f"{id_icon} สำเนาบัตรประจำตัวประชาชน")
+                                    
+                                    # ใบแสดงผลการเรียน
+                                    transcript_icon = "✓" if data['has_transcript'] else "✗"
+                                    st.markdown(f"{transcript_icon} สำเนาใบแสดงผลการเรียน")
+                                    
+                                    # เอกสารเสริม
+                                    st.markdown("\n**เอกสารเสริม:**")
+                                    name_change_icon = "✓" if data['has_name_change'] else "-"
+                                    st.markdown(f"{name_change_icon} หลักฐานการเปลี่ยนชื่อ-สกุล")
+                                    
+                                    other_count = data['other_docs']
+                                    if other_count > 0:
+                                        st.markdown(f"เอกสารอื่นๆ: {other_count} ไฟล์")
                                 
-                                # Create missing documents section HTML - DISABLED
-                                # missing_section = ""
-                                # if missing_docs:
-                                #     missing_section = f'''
-                                #     <div style="margin-top: 1rem;">
-                                #         <h5 style="color: #dc3545; margin: 0 0 0.5rem 0; font-size: 1rem; display: flex; align-items: center;">
-                                #             <span style="margin-right: 0.5rem;">❌</span> เอกสารที่ขาด:
-                                #         </h5>
-                                #         <p style="margin: 0; color: #666; font-size: 0.9rem; line-height: 1.4;">{missing_text}</p>
-                                #     </div>
-                                #     '''
-                                missing_section = ""  # Always empty to hide missing documents section
+                                with col2:
+                                    # แสดงสถานะรวม
+                                    completion_percentage = sum([data['has_photo'], data['has_id_card'], data['has_transcript']]) / 3 * 100
+                                    
+                                    if completion_percentage == 100:
+                                        st.success(f"ครบถ้วน\n{completion_percentage:.0f}%")
+                                    elif completion_percentage >= 66:
+                                        st.warning(f"เกือบครบ\n{completion_percentage:.0f}%")
+                                    else:
+                                        st.error(f"ไม่ครบ\n{completion_percentage:.0f}%")
                                 
-                                # Student Card Header with document details (Compact version)
-                                st.markdown(f"""
-                                <div style="
-                                    background: {status_bg};
-                                    padding: 0.6rem 1rem;
-                                    border-radius: 10px 10px 0 0;
-                                    color: white;
-                                    margin-top: 0.8rem;
-                                    box-shadow: 0 2px 8px rgba(0,0,0,0.08);
-                                ">
-                                    <div style="display: flex; align-items: center; justify-content: space-between;">
-                                        <div>
-                                            <h4 style="margin: 0; font-size: 1rem; font-weight: 600;">{data['name']}</h4>
-                                            <p style="margin: 0.2rem 0 0 0; opacity: 0.9; font-size: 0.75rem;">เลขบัตรประจำตัวประชาชน: {citizen_id}</p>
-                                        </div>
-                                        <div style="text-align: right;">
-                                            <span style="font-size: 0.9rem; font-weight: 600;">{status_text}</span>
-                                        </div>
-                                    </div>
-                                </div>
+                                st.divider()
                                 
-                                <div style="
-                                    background: white;
-                                    padding: 0.8rem;
-                                    border-radius: 0 0 10px 10px;
-                                    box-shadow: 0 2px 8px rgba(0,0,0,0.08);
-                                    margin-bottom: 0.6rem;
-                                ">
-                                    <div style="margin-bottom: 0.5rem;">
-                                        <h5 style="color: #28a745; margin: 0 0 0.3rem 0; font-size: 0.85rem; display: flex; align-items: center;">
-                                            เอกสารที่ครบ:
-                                        </h5>
-                                        <p style="margin: 0; color: #666; font-size: 0.75rem; line-height: 1.3;">{complete_text}</p>
-                                    </div>
-                                </div>
-                                """, unsafe_allow_html=True)
+                                # รายการไฟล์แบบเรียบง่าย
+                                st.markdown("**รายการไฟล์ที่อัพโหลด:**")
                                 
-                                with st.expander("ดูรายละเอียดเอกสาร", expanded=False):
-                                    # สรุปสถานะเอกสารแบบเรียบง่าย
-                                    col1, col2 = st.columns([2, 1])
-                                    
-                                    with col1:
-                                        # แสดงสถานะเอกสารจำเป็นในรูปแบบ checklist
-                                        st.markdown("**เอกสารจำเป็น:**")
-                                        
-                                        # รูปถ่าย
-                                        photo_icon = "✓" if data['has_photo'] else "✗"
-                                        st.markdown(f"{photo_icon} รูปถ่าย")
-                                        
-                                        # บัตรประชาชน
-                                        id_icon = "✓" if data['has_id_card'] else "✗"
-                                        st.markdown(f"{id_icon} สำเนาบัตรประจำตัวประชาชน")
-                                        
-                                        # ใบแสดงผลการเรียน
-                                        transcript_icon = "✓" if data['has_transcript'] else "✗"
-                                        st.markdown(f"{transcript_icon} สำเนาใบแสดงผลการเรียน")
-                                        
-                                        # เอกสารเสริม
-                                        st.markdown("\n**เอกสารเสริม:**")
-                                        name_change_icon = "✓" if data['has_name_change'] else "-"
-                                        st.markdown(f"{name_change_icon} หลักฐานการเปลี่ยนชื่อ-สกุล")
+                                if data['files']:
+                                    # แสดงรายการไฟล์ในรูปแบบตาราง
+                                    for file_info in data['files']:
+                                        ext = os.path.splitext(file_info['filename'])[1].lower()
+                                        col1, col2, col3 = st.columns([3, 2, 1])
                                         
-                                        other_count = data['other_docs']
-                                        if other_count > 0:
-                                            st.markdown(f"เอกสารอื่นๆ: {other_count} ไฟล์")
-                                    
-                                    with col2:
-                                        # แสดงสถานะรวม
-                                        completion_percentage = sum([data['has_photo'], data['has_id_card'], data['has_transcript']]) / 3 * 100
+                                        with col1:
+                                            # ไอคอนตามประเภทไฟล์
+                                            if ext in IMG_EXTS:
+                                                file_icon = "IMG"
+                                            elif ext == '.pdf':
+                                                file_icon = "DOC"
+                                            else:
+                                                file_icon = "FILE"
+                                            
+                                            st.markdown(f"{file_icon} **{file_info['doc_type_thai']}**")
+                                            st.caption(f"ขนาด: {file_info['size_kb']} KB | อัพโหลด: {file_info['upload_date']}")
                                         
-                                        if completion_percentage == 100:
-                                            st.success(f"ครบถ้วน\n{completion_percentage:.0f}%")
-                                        elif completion_percentage >= 66:
-                                            st.warning(f"เกือบครบ\n{completion_percentage:.0f}%")
-                                        else:
-                                            st.error(f"ไม่ครบ\n{completion_percentage:.0f}%")
-                                    
-                                    st.divider()
-                                    
-                                    # รายการไฟล์แบบเรียบง่าย
-                                    st.markdown("**รายการไฟล์ที่อัพโหลด:**")
-                                    
-                                    if data['files']:
-                                        # แสดงรายการไฟล์ในรูปแบบตาราง
-                                        for file_info in data['files']:
-                                            col1, col2, col3 = st.columns([3, 2, 1])
+                                        with col2:
+                                            # จัดเรียงปุ่มทั้ง 3 ปุ่มในแถวเดียวกันแบบสวยงาม
+                                            file_path = os.path.join(UPLOAD_DIR, file_info['filename'])
+                                            
+                                            # สร้าง columns สำหรับปุ่มทั้ง 3 ปุ่ม
+                                            btn_col1, btn_col2, btn_col3 = st.columns([1, 1, 1], gap="medium")
+                                            
+                                            # ปุ่มดูตัวอย่าง
+                                            preview_key = f"preview_{citizen_id}_{file_info['filename']}"
+                                            
+                                            # เริ่มต้น session state สำหรับเก็บรายการไฟล์ที่เปิดดู
+                                            if 'opened_previews' not in st.session_state:
+                                                st.session_state.opened_previews = set()
+                                            
+                                            # ตรวจสอบว่าไฟล์นี้เปิดดูอยู่หรือไม่
+                                            is_previewing = preview_key in st.session_state.opened_previews
                                             
-                                            with col1:
-                                                # ไอคอนตามประเภทไฟล์
-                                                if file_info['filename'].lower().endswith(('.png', '.jpg', '.jpeg')):
-                                                    file_icon = "IMG"
-                                                elif file_info['filename'].lower().endswith('.pdf'):
-                                                    file_icon = "DOC"
+                                            with btn_col1:
+                                                if is_previewing:
+                                                    # ปุ่มปิดตัวอย่าง
+                                                    if st.button("ปิด", key=f"close_{preview_key}", use_container_width=True, type="secondary", help="ปิดตัวอย่าง"):
+                                                        st.session_state.opened_previews.discard(preview_key)
+                                                        st.rerun()
                                                 else:
-                                                    file_icon = "FILE"
-                                                
-                                                st.markdown(f"{file_icon} **{file_info['doc_type_thai']}**")
-                                                st.caption(f"ขนาด: {file_info['size_kb']} KB | อัพโหลด: {file_info['upload_date']}")
+                                                    # ปุ่มเปิดตัวอย่าง
+                                                    if st.button("ดู", key=f"open_{preview_key}", use_container_width=True, type="primary", help="ดูตัวอย่างไฟล์"):
+                                                        st.session_state.opened_previews.add(preview_key)
+                                                        st.rerun()
                                             
-                                            with col2:
-                                                # จัดเรียงปุ่มทั้ง 3 ปุ่มในแถวเดียวกันแบบสวยงาม
-                                                file_path = os.path.join(UPLOAD_DIR, file_info['filename'])
-                                                
-                                                # เพิ่ม CSS สำหรับปุ่มที่สวยงาม
-                                                st.markdown("""
-                                                <style>
-                                                .action-buttons-container {
-                                                    display: flex;
-                                                    gap: 8px;
-                                                    align-items: center;
-                                                    justify-content: center;
-                                                    margin: 0.5rem 0;
-                                                    padding: 0.5rem;
-                                                    background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
-                                                    border-radius: 12px;
-                                                    border: 1px solid rgba(0,0,0,0.1);
-                                                    box-shadow: 0 2px 8px rgba(0,0,0,0.05);
-                                                }
-                                                .action-btn {
-                                                    flex: 1;
-                                                    min-height: 40px;
-                                                    border-radius: 8px;
-                                                    font-weight: 600;
-                                                    transition: all 0.3s ease;
-                                                    border: none;
-                                                    cursor: pointer;
-                                                }
-                                                .action-btn:hover {
-                                                    transform: translateY(-2px);
-                                                    box-shadow: 0 4px 12px rgba(0,0,0,0.15);
-                                                }
-                                                </style>
-                                                """, unsafe_allow_html=True)
-                                                
-                                                # สร้าง columns สำหรับปุ่มทั้ง 3 ปุ่ม
-                                                btn_col1, btn_col2, btn_col3 = st.columns([1, 1, 1], gap="medium")
-                                                
-                                                # ปุ่มดูตัวอย่าง
-                                                preview_key = f"preview_{citizen_id}_{file_info['filename']}"
-                                                
-                                                # เริ่มต้น session state สำหรับเก็บรายการไฟล์ที่เปิดดู
-                                                if 'opened_previews' not in st.session_state:
-                                                    st.session_state.opened_previews = set()
-                                                
-                                                # ตรวจสอบว่าไฟล์นี้เปิดดูอยู่หรือไม่
-                                                is_previewing = preview_key in st.session_state.opened_previews
-                                                
-                                                with btn_col1:
-                                                    if is_previewing:
-                                                        # ปุ่มปิดตัวอย่าง
-                                                        if st.button("ปิด", key=f"close_{preview_key}", use_container_width=True, type="secondary", help="ปิดตัวอย่าง"):
-                                                            st.session_state.opened_previews.discard(preview_key)
-                                                            st.rerun()
-                                                    else:
-                                                        # ปุ่มเปิดตัวอย่าง
-                                                        if st.button("ดู", key=f"open_{preview_key}", use_container_width=True, type="primary", help="ดูตัวอย่างไฟล์"):
-                                                            st.session_state.opened_previews.add(preview_key)
-                                                            st.rerun()
-                                                
-                                                with btn_col2:
-                                                    # ปุ่มดาวน์โหลด
-                                                    with open(file_path, 'rb') as f:
-                                                        st.download_button(
-                                                            "ดาวน์โหลด",
-                                                            f.read(),
-                                                            file_name=file_info['filename'],
-                                                            key=f"download_{citizen_id}_{file_info['filename']}",
-                                                            help="ดาวน์โหลดไฟล์",
-                                                            use_container_width=True,
-                                                            type="primary"
-                                                        )
-                                                
-                                                with btn_col3:
-                                                    # ปุ่มลบเอกสาร (สำหรับ admin เท่านั้น)
-                                                    delete_key = f"delete_{citizen_id}_{file_info['filename']}"
-                                                    if st.button(
-                                                        "ลบ", 
-                                                        key=delete_key,
-                                                        help="ลบเอกสาร",
-                                                        type="secondary",
-                                                        use_container_width=True
-                                                    ):
-                                                        # แสดง confirmation dialog
-                                                        st.session_state[f"confirm_delete_{delete_key}"] = True
+                                            with btn_col2:
+                                                # ปุ่มดาวน์โหลด
+                                                try:
+                                                    download_file_button(
+                                                        file_path,
+                                                        file_info['filename'],
+                                                        key=f"download_{citizen_id}_{file_info['filename']}",
+                                                        help_text="ดาวน์โหลดไฟล์"
+                                                    )
+                                                except OSError as e:
+                                                    st.error(f"ไม่สามารถเตรียมไฟล์สำหรับดาวน์โหลดได้: {str(e)}")
                                             
-                                            with col3:
-                                                # ย้ายส่วนนี้มาเป็น col3 เพื่อให้มีพื้นที่เพิ่มเติม
-                                                pass
-                                                
-                                                # Confirmation dialog
-                                                if st.session_state.get(f"confirm_delete_{delete_key}", False):
-                                                    st.warning(f"คุณต้องการลบไฟล์ '{file_info['doc_type_thai']}' ของ {data['name']} หรือไม่?")
-                                                    
-                                                    col_confirm, col_cancel = st.columns(2)
-                                                    with col_confirm:
-                                                        if st.button("ยืนยันลบ", key=f"confirm_yes_{delete_key}", type="primary", use_container_width=True):
-                                                            try:
-                                                                # ลบไฟล์จากระบบ
-                                                                if os.path.exists(file_path):
-                                                                    os.remove(file_path)
-                                                                    st.success(f"ลบไฟล์ '{file_info['doc_type_thai']}' เรียบร้อยแล้ว")
-                                                                    
-                                                                    # บันทึก log การลบไฟล์
-                                                                    log_entry = f"{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Admin '{user['username']}' deleted file '{file_info['filename']}' for student '{data['name']}' (ID: {citizen_id})\n"
-                                                                    with open(os.path.join(LOG_DIR, "file_deletions.log"), "a", encoding="utf-8") as log_file:
-                                                                        log_file.write(log_entry)
-                                                                    
-                                                                    # รีเซ็ต confirmation state
-                                                                    del st.session_state[f"confirm_delete_{delete_key}"]
-                                                                    st.rerun()
-                                                                else:
-                                                                    st.error("ไม่พบไฟล์ที่ต้องการลบ")
-                                                            except Exception as e:
-                                                                st.error(f"เกิดข้อผิดพลาดในการลบไฟล์: {str(e)}")
-                                                    
-                                                    with col_cancel:
-                                                        if st.button("ยกเลิก", key=f"confirm_no_{delete_key}", use_container_width=True):
-                                                            del st.session_state[f"confirm_delete_{delete_key}"]
-                                                            st.rerun()
+                                            with btn_col3:
+                                                # ปุ่มลบเอกสาร (สำหรับ admin เท่านั้น)
+                                                delete_key = f"delete_{citizen_id}_{file_info['filename']}"
+                                                if st.button(
+                                                    "ลบ", 
+                                                    key=delete_key,
+                                                    help="ลบเอกสาร",
+                                                    type="secondary",
+                                                    use_container_width=True
+                                                ):
+                                                    # แสดง confirmation dialog
+                                                    st.session_state[f"confirm_delete_{delete_key}"] = True
+                                        
+                                        with col3:
+                                            # ย้ายส่วนนี้มาเป็น col3 เพื่อให้มีพื้นที่เพิ่มเติม
+                                            pass
                                             
-                                            # แสดงตัวอย่างไฟล์ถ้าเปิดดูอยู่
-                                            if is_previewing:
-                                                file_path = os.path.join(UPLOAD_DIR, file_info['filename'])
+                                            # Confirmation dialog
+                                            if st.session_state.get(f"confirm_delete_{delete_key}", False):
+                                                st.warning(f"คุณต้องการลบไฟล์ '{file_info['doc_type_thai']}' ของ {data['name']} หรือไม่?")
                                                 
-                                                # สร้าง container สำหรับแสดงตัวอย่าง
-                                                st.markdown("""
-                                                <div style="
-                                                    background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
-                                                    padding: 1.5rem;
-                                                    border-radius: 15px;
-                                                    margin: 1rem 0;
-                                                    border: 2px solid #1e40af;
-                                                    box-shadow: 0 4px 15px rgba(30,64,175,0.1);
-                                                ">
-                                                    <h5 style="color: #1e40af; margin-bottom: 1rem; display: flex; align-items: center;">
-                                                        ตัวอย่างไฟล์
-                                                    </h5>
-                                                </div>
-                                                """, unsafe_allow_html=True)
+                                                col_confirm, col_cancel = st.columns(2)
+                                                with col_confirm:
+                                                    if st.button("ยืนยันลบ", key=f"confirm_yes_{delete_key}", type="primary", use_container_width=True):
+                                                        try:
+                                                            # ลบไฟล์จากระบบ
+                                                            if os.path.exists(file_path):
+                                                                os.remove(file_path)
+                                                                st.success(f"ลบไฟล์ '{file_info['doc_type_thai']}' เรียบร้อยแล้ว")
+                                                                
+                                                                # บันทึก log การลบไฟล์
+                                                                log_entry = f"{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Admin '{user['username']}' deleted file '{file_info['filename']}' for student '{data['name']}' (ID: {citizen_id})\n"
+                                                                LOG_WRITER.append(os.path.join(LOG_DIR, "file_deletions.log"), log_entry)
+                                                                
+                                                                # รีเซ็ต confirmation state
+                                                                del st.session_state[f"confirm_delete_{delete_key}"]
+                                                                st.rerun()
+                                                            else:
+                                                                st.error("ไม่พบไฟล์ที่ต้องการลบ")
+                                                        except Exception as e:
+                                                            st.error(f"เกิดข้อผิดพลาดในการลบไฟล์: {str(e)}")
                                                 
-                                                try:
-                                                    # ตรวจสอบประเภทไฟล์และแสดงตัวอย่าง
-                                                    if file_info['filename'].lower().endswith(('.png', '.jpg', '.jpeg')):
-                                                        # แสดงรูปภาพ
-                                                        st.image(file_path, caption=f"ตัวอย่าง: {file_info['doc_type_thai']}", use_container_width=True)
-                                                    elif file_info['filename'].lower().endswith('.pdf'):
-                                                        # แสดง PDF
-                                                        with open(file_path, 'rb') as pdf_file:
-                                                            pdf_data = pdf_file.read()
-                                                            st.markdown("""
-                                                            <div style="
-                                                                background: white;
-                                                                padding: 1rem;
-                                                                border-radius: 10px;
-                                                                border: 1px solid #dee2e6;
-                                                                text-align: center;
-                                                            ">
-                                                                <p style="margin: 0; color: #6c757d;">ไฟล์ PDF พร้อมดาวน์โหลด</p>
-                                                                <p style="margin: 0.5rem 0 0 0; font-size: 0.9rem; color: #868e96;">กดปุ่มดาวน์โหลดเพื่อดูเอกสารแบบเต็ม</p>
-                                                            </div>
-                                                            """, unsafe_allow_html=True)
-                                                            
-                                                            # แสดง PDF ใน iframe (ถ้าเบราว์เซอร์รองรับ)
-                                                            import base64
-                                                            base64_pdf = base64.b64encode(pdf_data).decode('utf-8')
-                                                            pdf_display = f'<iframe src="data:application/pdf;base64,{base64_pdf}" width="100%" height="400" type="application/pdf"></iframe>'
-                                                            st.markdown(pdf_display, unsafe_allow_html=True)
-                                                    else:
-                                                        st.info("ไม่สามารถแสดงตัวอย่างไฟล์ประเภทนี้ได้ กรุณาดาวน์โหลดเพื่อดู")
-                                                except Exception as e:
-                                                    st.error(f"ไม่สามารถแสดงตัวอย่างไฟล์ได้: {str(e)}")
+                                                with col_cancel:
+                                                    if st.button("ยกเลิก", key=f"confirm_no_{delete_key}", use_container_width=True):
+                                                        del st.session_state[f"confirm_delete_{delete_key}"]
+                                                        st.rerun()
+                                        
+                                        # แสดงตัวอย่างไฟล์ถ้าเปิดดูอยู่
+                                        if is_previewing:
+                                            file_path = os.path.join(UPLOAD_DIR, file_info['filename'])
                                             
-                                            st.markdown("---")
-                                    
-                                    else:
-                                        st.markdown("""
-                                        <div style="
-                                            background: linear-gradient(135deg, #fff3cd 0%, #ffeaa7 100%);
-                                            padding: 2rem;
-                                            border-radius: 15px;
-                                            text-align: center;
-                                            margin: 1rem 0;
-                                            border: 2px dashed #ffc107;
-                                            box-shadow: 0 4px 15px rgba(255,193,7,0.1);
-                                        ">
+                                            # สร้าง container สำหรับแสดงตัวอย่าง
+                                            st.markdown("""
                                             <div style="
-                                                width: 80px;
-                                                height: 80px;
-                                                background: rgba(255,193,7,0.2);
-                                                border-radius: 50%;
-                                                margin: 0 auto 1rem;
-                                                display: flex;
-                                                align-items: center;
-                                                justify-content: center;
-                                                font-size: 2rem;
-                                            ">📂</div>
-                                            <h4 style="color: #856404; margin-bottom: 0.5rem;">ยังไม่มีไฟล์ที่อัพโหลด</h4>
-                                            <p style="color: #856404; margin: 0; opacity: 0.8;">นักเรียนยังไม่ได้อัพโหลดเอกสารใดๆ</p>
-                                        </div>
-                                        """, unsafe_allow_html=True)
-                        else:
-                            # No students found message with beautiful styling
-                            st.markdown("""
-                            <div style="
-                                background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
-                                padding: 3rem;
-                                border-radius: 20px;
-                                text-align: center;
-                                margin: 2rem 0;
-                                border: 2px dashed #6c757d;
-                                box-shadow: 0 4px 15px rgba(0,0,0,0.1);
-                            ">
-                                <div style="
-                                    width: 120px;
-                                    height: 120px;
-                                    background: rgba(108,117,125,0.1);
-                                    border-radius: 50%;
-                                    margin: 0 auto 1.5rem;
-                                    display: flex;
-                                    align-items: center;
-                                    justify-content: center;
-                                    font-size: 3rem;
-                                ">🔍</div>
-                                <h3 style="color: #6c757d; margin-bottom: 1rem; font-size: 1.5rem;">ไม่พบนักเรียนที่ตรงกับเงื่อนไขการค้นหา</h3>
-                                <p style="color: #868e96; font-size: 1.1rem; margin: 0;">ลองปรับเปลี่ยนคำค้นหาหรือตัวกรองเพื่อค้นหานักเรียน</p>
-                            </div>
-                            """, unsafe_allow_html=True)
-                    
-                    # Add pagination controls below the student list or "no students found" message
-                    if total_pages > 1:
-                        st.markdown("<br>", unsafe_allow_html=True)
-                        col1, col2, col3, col4, col5 = st.columns([1, 1, 2, 1, 1])
-                        
-                        with col2:
-                            if st.button("หน้าก่อนหน้า", disabled=(current_page == 1), key="prev_page"):
-                                st.session_state.current_page = current_page - 1
-                                st.rerun()
-                        
-                        with col3:
-                            st.info(f"**หน้า {current_page} จาก {total_pages}**")
-                        
-                        with col4:
-                            if st.button("หน้าถัดไป", disabled=(current_page == total_pages), key="next_page"):
-                                st.session_state.current_page = current_page + 1
-                                st.rerun()
-                    
+                                                background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
+                                                padding: 1.5rem;
+                                                border-radius: 15px;
+                                                margin: 1rem 0;
+                                                border: 2px solid #1e40af;
+                                                box-shadow: 0 4px 15px rgba(30,64,175,0.1);
+                                            ">
+                                                <h5 style="color: #1e40af; margin-bottom: 1rem; display: flex; align-items: center;">
+                                                    ตัวอย่างไฟล์
+                                                </h5>
+                                            </div>
+                                            """, unsafe_allow_html=True)
+                                            
+                                            try:
+                                                # ตรวจสอบประเภทไฟล์และแสดงตัวอย่าง
+                                                if ext in IMG_EXTS:
+                                                    # แสดงรูปภาพ
+                                                    st.image(image_preview(file_path, os.stat(file_path).st_mtime_ns), caption=f"ตัวอย่าง: {file_info['doc_type_thai']}", use_container_width=True)
+                                                elif ext == '.pdf':
+                                                    # แสดง PDF
+                                                    with open(file_path, 'rb') as pdf_file:
+                                                        pdf_data = pdf_file.read()
+                                                        st.markdown("""
+                                                        <div style="
+                                                            background: white;
+                                                            padding: 1rem;
+                                                            border-radius: 10px;
+                                                            border: 1px solid #dee2e6;
+                                                            text-align: center;
+                                                        ">
+                                                            <p style="margin: 0; color: #6c757d;">ไฟล์ PDF พร้อมดาวน์โหลด</p>
+                                                            <p style="margin: 0.5rem 0 0 0; font-size: 0.9rem; color: #868e96;">กดปุ่มดาวน์โหลดเพื่อดูเอกสารแบบเต็ม</p>
+                                                        </div>
+                                                        """, unsafe_allow_html=True)
+                                                        
+                                                        # แสดง PDF ใน iframe (ถ้าเบราว์เซอร์รองรับ)
+                                                        import base64
+                                                        base64_pdf = base64.b64encode(pdf_data).decode('utf-8')
+                                                        pdf_display = f'<iframe src="data:application/pdf;base64,{base64_pdf}" width="100%" height="400" type="application/pdf"></iframe>'
+                                                        st.markdown(pdf_display, unsafe_allow_html=True)
+                                                else:
+                                                    st.info("ไม่สามารถแสดงตัวอย่างไฟล์ประเภทนี้ได้ กรุณาดาวน์โหลดเพื่อดู")
+                                            except Exception as e:
+                                                st.error(f"ไม่สามารถแสดงตัวอย่างไฟล์ได้: {str(e)}")
+                                        
+                                        st.markdown("---")
+                                
+                                else:
+                                    st.markdown("""
+                                    <div style="
+                                        background: linear-gradient(135deg, #fff3cd 0%, #ffeaa7 100%);
+                                        padding: 2rem;
+                                        border-radius: 15px;
+                                        text-align: center;
+                                        margin: 1rem 0;
+                                        border: 2px dashed #ffc107;
+                                        box-shadow: 0 4px 15px rgba(255,193,7,0.1);
+                                    ">
+                                        <div style="
+                                            width: 80px;
+                                            height: 80px;
+                                            background: rgba(255,193,7,0.2);
+                                            border-radius: 50%;
+                                            margin: 0 auto 1rem;
+                                            display: flex;
+                                            align-items: center;
+                                            justify-content: center;
+                                            font-size: 2rem;
+                                        ">📂</div>
+                                        <h4 style="color: #856404; margin-bottom: 0.5rem;">ยังไม่มีไฟล์ที่อัพโหลด</h4>
+                                        <p style="color: #856404; margin: 0; opacity: 0.8;">นักเรียนยังไม่ได้อัพโหลดเอกสารใดๆ</p>
+                                    </div>
+                                    """, unsafe_allow_html=True)
                     else:
-                        pass  # No message when no documents are uploaded
-                else:
-                # Folder not found message with beautiful styling
-                    st.markdown("""
-                    <div style="
-                        background: linear-gradient(135deg, #fff3cd 0%, #ffeaa7 100%);
-                        padding: 3rem;
-                        border-radius: 20px;
-                        text-align: center;
-                        margin: 2rem 0;
-                        border: 2px dashed #ffc107;
-                        box-shadow: 0 4px 15px rgba(255,193,7,0.2);
-                    ">
+                        # No students found message with beautiful styling
+                        st.markdown("""
                         <div style="
-                            width: 120px;
-                            height: 120px;
-                            background: rgba(255,193,7,0.1);
-                            border-radius: 50%;
-                            margin: 0 auto 1.5rem;
-                            display: flex;
-                            align-items: center;
-                            justify-content: center;
-                            font-size: 3rem;
-                        ">📁</div>
-                        <h3 style="color: #856404; margin-bottom: 1rem; font-size: 1.5rem;">ไม่พบโฟลเดอร์เก็บเอกสาร</h3>
-                        <p style="color: #856404; font-size: 1.1rem; margin: 0;">โฟลเดอร์เก็บเอกสารยังไม่ถูกสร้าง กรุณาติดต่อผู้ดูแลระบบ</p>
-                    </div>
-                    """, unsafe_allow_html=True)  
+                            background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
+                            padding: 3rem;
+                            border-radius: 20px;
+                            text-align: center;
+                            margin: 2rem 0;
+                            border: 2px dashed #6c757d;
+                            box-shadow: 0 4px 15px rgba(0,0,0,0.1);
+                        ">
+                            <div style="
+                                width: 120px;
+                                height: 120px;
+                                background: rgba(108,117,125,0.1);
+                                border-radius: 50%;
+                                margin: 0 auto 1.5rem;
+                                display: flex;
+                                align-items: center;
+                                justify-content: center;
+                                font-size: 3rem;
+                            ">🔍</div>
+                            <h3 style="color: #6c757d; margin-bottom: 1rem; font-size: 1.5rem;">ไม่พบนักเรียนที่ตรงกับเงื่อนไขการค้นหา</h3>
+                            <p style="color: #868e96; font-size: 1.1rem; margin: 0;">ลองปรับเปลี่ยนคำค้นหาหรือตัวกรองเพื่อค้นหานักเรียน</p>
+                        </div>
+                        """, unsafe_allow_html=True)
+                
+                # Add pagination controls below the student list or "no students found" message
+                if total_pages > 1:
+                    st.markdown("<br>", unsafe_allow_html=True)
+                    col1, col2, col3, col4, col5 = st.columns([1, 1, 2, 1, 1])
+                    
+                    with col2:
+                        if st.button("หน้าก่อนหน้า", disabled=(current_page == 1), key="prev_page"):
+                            st.session_state.current_page = current_page - 1
+                            st.rerun()
+                    
+                    with col3:
+                        st.info(f"**หน้า {current_page} จาก {total_pages}**")
+                    
+                    with col4:
+                        if st.button("หน้าถัดไป", disabled=(current_page == total_pages), key="next_page"):
+                            st.session_state.current_page = current_page + 1
+                            st.rerun()
+                
+                else:
+                    pass  # No message when no documents are uploaded
         
             with tab3:
                 # User Management Tab with sub-tabs
@@ -2364,7 +2682,7 @@ else:
                 
                 with user_tab1: 
                     # Load all users
-                    users = DataManager.load_json(USERS_FILE, {})
+                    users = DataManager.load_json_readonly(USERS_FILE, {})
 
                     if users:
                         # Group provinces by regions
@@ -2775,14 +3093,13 @@ else:
                                             new_gpax = st.text_input("เกรดเฉลี่ย", value=gpax_formatted, key=f"gpax_{username}")
                                         with col_d:
                                             current_year = user_data.get('graduation_year', 2024)
-                                            year_options = list(range(2020, 2030))
-                                            if current_year in year_options:
-                                                year_index = year_options.index(current_year)
+                                            if current_year in GRAD_YEARS:
+                                                year_index = GRAD_YEARS.index(current_year)
                                             else:
-                                                year_index = year_options.index(2024)
+                                                year_index = GRAD_YEARS.index(2024)
                                             new_graduation_year = st.selectbox(
                                                 "ปีที่จบการศึกษา",
-                                                options=year_options,
+                                                options=GRAD_YEARS,
                                                 index=year_index,
                                                 key=f"year_{username}"
                                             )
@@ -2793,12 +3110,9 @@ else:
                                         
                                         # Province selection
                                         current_province = user_data.get('province', '')
-                                        province_options = [""] + THAI_PROVINCES
-                                        province_index = 0
-                                        if current_province and current_province in THAI_PROVINCES:
-                                            province_index = province_options.index(current_province)
+                                        province_index = PROVINCE_OPTION_INDEX.get(current_province, 0)
                                         
-                                        new_province = st.selectbox("จังหวัด", options=province_options, index=province_index, key=f"prov_{username}")
+                                        new_province = st.selectbox("จังหวัด", options=PROVINCE_OPTIONS, index=province_index, key=f"prov_{username}")
                                         
                                         col_e, col_f = st.columns(2)
                                         with col_e:
@@ -2810,9 +3124,9 @@ else:
                                         st.markdown("**เปลี่ยนรหัสผ่าน (ไม่บังคับ)**")
                                         col_g, col_h = st.columns(2)
                                         with col_g:
-                                            new_password = st.text_input("รหัสผ่านใหม่", type="password", key=f"pwd_{username}")
+                                            new_password = st.text_input("รหัสผ่านใหม่", type="password", max_chars=MAX_PASSWORD_BYTES, key=f"pwd_{username}")
                                         with col_h:
-                                            confirm_new_password = st.text_input("ยืนยันรหัสผ่านใหม่", type="password", key=f"cpwd_{username}")
+                                            confirm_new_password = st.text_input("ยืนยันรหัสผ่านใหม่", type="password", max_chars=MAX_PASSWORD_BYTES, key=f"cpwd_{username}")
                                         
                                         submit_admin_edit = st.form_submit_button("💾 บันทึกการเปลี่ยนแปลง", use_container_width=True)
                                     
@@ -2849,39 +3163,26 @@ else:
                                                 st.rerun()
                                             else:
                                                 # ลบผู้ใช้
-                                                users = DataManager.load_json(USERS_FILE, {})
-                                                if username in users:
-                                                    # ลบไฟล์เอกสารของผู้ใช้
-                                                    user_files_pattern = f"{user_data.get('citizen_id', '')}_{user_data.get('first_name', '')}-{user_data.get('last_name', '')}_*"
-                                                    import glob
-                                                    user_files = glob.glob(os.path.join(UPLOAD_DIR, user_files_pattern))
-                                                    for file_path in user_files:
-                                                        try:
-                                                            os.remove(file_path)
-                                                        except:
-                                                            pass
+                                                with get_file_lock(USERS_FILE):
+                                                    users = DataManager.load_json(USERS_FILE, {})
+                                                    user_deleted = username in users
+                                                    if user_deleted:
+                                                        # ลบผู้ใช้จากฐานข้อมูล
+                                                        del users[username]
+                                                        DataManager.save_json(USERS_FILE, users)
+                                                if user_deleted:
+                                                    get_user_cached.clear()
                                                     
-                                                    # ลบผู้ใช้จากฐานข้อมูล
-                                                    del users[username]
-                                                    DataManager.save_json(USERS_FILE, users)
+                                                    # ลบไฟล์เอกสารของผู้ใช้
+                                                    user_files_prefix = f"{user_data.get('citizen_id', '')}_{user_data.get('first_name', '')}-{user_data.get('last_name', '')}_"
+                                                    DataManager.remove_uploads(user_files_prefix)
                                                     
                                                     # ลบ session ของผู้ใช้ (ถ้ามี)
-                                                    sessions = DataManager.load_json(SESSIONS_FILE, {})
-                                                    sessions_to_delete = []
-                                                    for session_id, session_data in sessions.items():
-                                                        if session_data.get('username') == username:
-                                                            sessions_to_delete.append(session_id)
-                                                    
-                                                    for session_id in sessions_to_delete:
-                                                        del sessions[session_id]
-                                                    
-                                                    if sessions_to_delete:
-                                                        DataManager.save_json(SESSIONS_FILE, sessions)
+                                                    AuthManager.remove_user_sessions(username)
                                                     
                                                     # Log การลบ
                                                     log_entry = f"{datetime.datetime.now().isoformat()} - Admin {user['username']} deleted user {username}\n"
-                                                    with open(os.path.join(LOG_DIR, "user_changes.log"), "a", encoding="utf-8") as f:
-                                                        f.write(log_entry)
+                                                    LOG_WRITER.append(os.path.join(LOG_DIR, "user_changes.log"), log_entry)
                                                     
                                                     st.success(f"ลบผู้ใช้ {username} สำเร็จ!")
                                                     # รีเซ็ตสถานะการยืนยัน
@@ -2940,6 +3241,8 @@ else:
                                                     errors.append("รหัสผ่านใหม่ไม่ตรงกัน")
                                                 elif len(new_password) < 6:
                                                     errors.append("รหัสผ่านต้องมีอย่างน้อย 6 ตัวอักษร")
+                                                elif AuthManager.password_too_long(new_password):
+                                                    errors.append(PASSWORD_TOO_LONG_MSG)
                                             
                                             if errors:
                                                 for error in errors:
@@ -2955,7 +3258,7 @@ else:
                                                     'email': new_email,
                                                     'school_name': new_school_name,
                                                     'major': new_major,
-                                                    'gpax': round(float(new_gpax), 2),
+                                                    'gpax': Validator.parse_gpax(new_gpax),
                                                     'graduation_year': new_graduation_year,
                                                     'address': new_address,
                                                     'province': new_province,
@@ -3035,7 +3338,7 @@ else:
                     """, unsafe_allow_html=True)
                     
                     # Load users data
-                    users = DataManager.load_json(USERS_FILE, {})
+                    users = DataManager.load_json_readonly(USERS_FILE, {})
                     
                     # Filter out admin users
                     regular_users = {username: user_data for username, user_data in users.items() 
@@ -3076,8 +3379,23 @@ else:
                             </div>
                             """, unsafe_allow_html=True)
                             
-                            # Prepare data for table
-                            table_data = []
+                            # Prepare data for table, one list per column
+                            table_data = {column: [] for column in (
+                                'คำนำหน้า',
+                                'ชื่อ',
+                                'สกุล',
+                                'เบอร์โทรศัพท์',
+                                'อีเมล',
+                                'รหัสบัตรประชาชน',
+                                'วันเดือนปีเกิด',
+                                'อายุ',
+                                'สาขาวิชาที่จบ',
+                                'สถาบันการศึกษาที่จบ',
+                                'ที่อยู่',
+                                'จังหวัด',
+                                'GPAX',
+                                'วันเวลาที่ลงทะเบียน'
+                            )}
                             for username, user_data in filtered_users.items():
                                 # Calculate age from birth_date
                                 age = "-"
@@ -3098,22 +3416,20 @@ else:
                                     except:
                                         reg_date = "-"
                                 
-                                table_data.append({
-                                    'คำนำหน้า': user_data.get('title', '-'),
-                                    'ชื่อ': user_data.get('first_name', '-'),
-                                    'สกุล': user_data.get('last_name', '-'),
-                                    'เบอร์โทรศัพท์': user_data.get('phone', '-'),
-                                    'อีเมล': user_data.get('email', '-'),
-                                    'รหัสบัตรประชาชน': user_data.get('citizen_id', '-'),
-                                    'วันเดือนปีเกิด': user_data.get('birth_date', '-'),
-                                    'อายุ': str(age),
-                                    'สาขาวิชาที่จบ': user_data.get('major', '-'),
-                                    'สถาบันการศึกษาที่จบ': user_data.get('school_name', '-'),
-                                    'ที่อยู่': user_data.get('address', '-'),
-                                    'จังหวัด': user_data.get('province', '-'),
-                                    'GPAX': str(user_data.get('gpax', '-')),
-                                    'วันเวลาที่ลงทะเบียน': reg_date
-                                })
+                                table_data['คำนำหน้า'].append(user_data.get('title', '-'))
+                                table_data['ชื่อ'].append(user_data.get('first_name', '-'))
+                                table_data['สกุล'].append(user_data.get('last_name', '-'))
+                                table_data['เบอร์โทรศัพท์'].append(user_data.get('phone', '-'))
+                                table_data['อีเมล'].append(user_data.get('email', '-'))
+                                table_data['รหัสบัตรประชาชน'].append(user_data.get('citizen_id', '-'))
+                                table_data['วันเดือนปีเกิด'].append(user_data.get('birth_date', '-'))
+                                table_data['อายุ'].append(str(age))
+                                table_data['สาขาวิชาที่จบ'].append(user_data.get('major', '-'))
+                                table_data['สถาบันการศึกษาที่จบ'].append(user_data.get('school_name', '-'))
+                                table_data['ที่อยู่'].append(user_data.get('address', '-'))
+                                table_data['จังหวัด'].append(user_data.get('province', '-'))
+                                table_data['GPAX'].append(str(user_data.get('gpax', '-')))
+                                table_data['วันเวลาที่ลงทะเบียน'].append(reg_date)
                             
                             
                             # Convert to DataFrame for better display
@@ -3150,11 +3466,14 @@ else:
                             col1, col2, col3 = st.columns([1, 1, 2])
                             
                             with col1:
-                                # Download as CSV
-                                csv = df.to_csv(index=False, encoding='utf-8-sig')
+                                # Download as CSV (with a UTF-8 BOM so Excel detects the Thai text)
+                                csv_buffer = io.StringIO()
+                                csv_writer = csv.writer(csv_buffer)
+                                csv_writer.writerow(table_data.keys())
+                                csv_writer.writerows(zip(*table_data.values()))
                                 st.download_button(
                                     label="ดาวน์โหลด CSV",
-                                    data=csv,
+                                    data='\ufeff' + csv_buffer.getvalue(),
                                     file_name=f"users_list_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
                                     mime="text/csv",
                                     use_container_width=True
@@ -3291,8 +3610,7 @@ else:
                             }
                             filtered_messages = [msg for msg in filtered_messages if msg.get('message_type') == type_mapping.get(message_type_filter)]
                         
-                        # Sort by timestamp (newest first)
-                        filtered_messages.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
+                        # get_messages already returns newest first, and filtering keeps that order
                         
                         if filtered_messages:
                             st.info(f"**จำนวนข้อความ: {len(filtered_messages)} ข้อความ**")
@@ -3319,7 +3637,7 @@ else:
                                 }.get(message.get('message_type', 'other'), "อื่นๆ")
                                 
                                 # ดึงข้อมูลผู้ใช้จาก username
-                                sender_user = UserManager.get_user(message.get('sender_username', ''))
+                                sender_user = get_user_cached(message.get('sender_username', ''))
                                 sender_display = "ไม่ทราบ"
                                 if sender_user:
                                     title = sender_user.get('title', '')
@@ -3334,8 +3652,7 @@ else:
                                     # แสดงข้อมูลผู้ส่งและวันที่ส่ง
                                     col1, col2 = st.columns(2)
                                     with col1:
-                                        # ดึงข้อมูลผู้ใช้เพื่อแสดงชื่อ-สกุล และรหัสบัตรประชาชน
-                                        sender_user = UserManager.get_user(message.get('sender_username', ''))
+                                        # แสดงชื่อ-สกุล และรหัสบัตรประชาชนจากข้อมูลผู้ส่งที่ดึงไว้แล้ว
                                         if sender_user:
                                             sender_display = f"{sender_user.get('first_name', '')} {sender_user.get('last_name', '')} ({sender_user.get('citizen_id', '')})"
                                         else:
@@ -3416,7 +3733,7 @@ else:
     else:
         # Regular user interface
         # Check if user wants to show message form
-        if st.session_state.get('show_message_form', False):
+        if st.session_state.show_message_form:
             # Message form interface
             st.error("**ส่งข้อความให้แอดมิน**\n\nหากคุณลืมรหัสผ่านหรือมีปัญหาอื่นๆ กรุณาส่งข้อความมาที่นี่")
             
@@ -3623,74 +3940,18 @@ else:
                 
                 with st.form("upload_form"):
                     # Document upload sections with beautiful cards
-                    documents = [
-                        {
-                            "title": "1. รูปถ่าย",
-                            "icon": "",
-                            "color": "#007bff",
-                            "key": "photo_upload",
-                            "types": ['jpg', 'jpeg', 'png'],
-                            "help": "รูปถ่ายหน้าตรง ชัดเจน • JPG, JPEG, PNG • สูงสุด 200MB",
-                            "required": True
-                        },
-                        {
-                            "title": "2. สำเนาบัตรประจำตัวประชาชน",
-                            "icon": "",
-                            "color": "#28a745",
-                            "key": "id_card_upload",
-                            "types": ['pdf', 'jpg', 'jpeg', 'png'],
-                            "help": "สำเนาบัตรประชาชนที่ชัดเจน • PDF, JPG, JPEG, PNG • สูงสุด 200MB",
-                            "required": True
-                        },
-                        {
-                            "title": "3. สำเนาใบแสดงผลการเรียน",
-                            "icon": "",
-                            "color": "#ffc107",
-                            "key": "transcript_upload",
-                            "types": ['pdf', 'jpg', 'jpeg', 'png'],
-                            "help": "ใบแสดงผลการเรียน (ม.6) • PDF, JPG, JPEG, PNG • สูงสุด 200MB",
-                            "required": True
-                        },
-                        {
-                            "title": "4. สำเนาหลักฐานการเปลี่ยนชื่อ-สกุล หรือหลักฐานอื่นๆ",
-                            "icon": "",
-                            "color": "#6c757d",
-                            "key": "other_upload",
-                            "types": ['pdf', 'jpg', 'jpeg', 'png'],
-                            "help": "เฉพาะกรณีที่มีการเปลี่ยนชื่อ-สกุล • PDF, JPG, JPEG, PNG • สูงสุด 200MB",
-                            "required": False
-                        }
-                    ]
-                    
                     uploaded_files = {}
                     
-                    for doc in documents:
+                    for doc in USER_UPLOAD_DOCUMENTS:
                         # Create card for each document
-                        required_text = " *" if doc["required"] else " (ไม่บังคับ)"
-                        st.markdown(f"""
-                        <div style="
-                            background: linear-gradient(135deg, {doc['color']}15 0%, {doc['color']}05 100%);
-                            padding: 1.5rem;
-                            border-radius: 15px;
-                            border-left: 4px solid {doc['color']};
-                            margin-bottom: 1.5rem;
-                            box-shadow: 0 4px 15px rgba(0,0,0,0.05);
-                        ">
-                            <h4 style="color: {doc['color']}; margin-bottom: 1rem; display: flex; align-items: center; font-size: 1.2rem;">
-                                {doc['title']}{required_text}
-                            </h4>
-                            <p style="color: #6c757d; margin-bottom: 1rem; font-size: 0.9rem; line-height: 1.5;">
-                                {doc['help']}
-                            </p>
-                        </div>
-                        """, unsafe_allow_html=True)
+                        st.markdown(doc_card_html(doc.title, doc.tone, doc.icon, doc.help, doc.required), unsafe_allow_html=True)
                         
                         # File uploader
-                        uploaded_files[doc['key']] = st.file_uploader(
-                            f"เลือกไฟล์สำหรับ {doc['title']}",
-                            type=doc['types'],
-                            help=doc['help'],
-                            key=doc['key'],
+                        uploaded_files[doc.key] = st.file_uploader(
+                            f"เลือกไฟล์สำหรับ {doc.title}",
+                            type=doc.types,
+                            help=doc.help,
+                            key=doc.key,
                             label_visibility="collapsed"
                         )
                         
@@ -3724,68 +3985,69 @@ else:
                             st.error(f"กรุณาอัพโหลดเอกสารที่จำเป็น: {', '.join(missing_files)}")
                         else:
                             # Process all uploaded files
-                            uploaded_files = [
-                                (photo_file, "รูปถ่าย"),
-                                (id_card_file, "สำเนาบัตรประจำตัวประชาชน"),
-                                (transcript_file, "สำเนาใบแสดงผลการเรียน")
-                            ]
-                            
-                            # Add optional file if uploaded
-                            if other_file is not None:
-                                uploaded_files.append((other_file, "หลักฐานการเปลี่ยนชื่อ-สกุล"))
+                            uploaded_files = tuple(
+                                (f, t) for f, t in (
+                                    (photo_file, "รูปถ่าย"),
+                                    (id_card_file, "สำเนาบัตรประจำตัวประชาชน"),
+                                    (transcript_file, "สำเนาใบแสดงผลการเรียน"),
+                                    (other_file, "หลักฐานการเปลี่ยนชื่อ-สกุล")
+                                ) if f is not None
+                            )
                             
                             success_count = 0
+                            upload_log_lines = []
                             error_messages = []
+                            now_iso = datetime.datetime.now().isoformat()
+                            # Every file for this user shares this prefix; only the document type and extension vary
+                            safe_name = f"{user['first_name']}-{user['last_name']}".replace(' ', '-')
+                            user_file_prefix = f"{user['citizen_id']}_{safe_name}_"
                             
                             # Remove all existing files for this user before uploading new ones
                             try:
-                                safe_name = f"{user['first_name']}-{user['last_name']}".replace(' ', '-')
-                                user_file_prefix = f"{user['citizen_id']}_{safe_name}_"
-                                
                                 # Find and remove all files that belong to this user
-                                for existing_file in os.listdir(UPLOAD_DIR):
-                                    if existing_file.startswith(user_file_prefix):
-                                        existing_file_path = os.path.join(UPLOAD_DIR, existing_file)
-                                        try:
-                                            os.remove(existing_file_path)
-                                            # Log file removal
-                                            log_entry = f"{datetime.datetime.now().isoformat()} - Old file removed for {user['username']}: {existing_file}\n"
-                                            with open(os.path.join(LOG_DIR, 'user_changes.log'), 'a', encoding='utf-8') as f:
-                                                f.write(log_entry)
-                                        except Exception as e:
-                                            error_messages.append(f"ไม่สามารถลบไฟล์เก่า {existing_file} ได้: {str(e)}")
+                                for existing_file, error in DataManager.remove_uploads(user_file_prefix):
+                                    if error is not None:
+                                        error_messages.append(f"ไม่สามารถลบไฟล์เก่า {existing_file} ได้: {str(error)}")
+                                        continue
+                                    # Log file removal
+                                    upload_log_lines.append(f"{now_iso} - Old file removed for {user['username']}: {existing_file}\n")
                             except Exception as e:
                                 error_messages.append(f"เกิดข้อผิดพลาดในการตรวจสอบไฟล์เก่า: {str(e)}")
                             
+                            upload_jobs = []
                             for uploaded_file, doc_type in uploaded_files:
-                                if uploaded_file is not None:
-                                    try:
-                                        # Generate filename according to convention
-                                        file_extension = uploaded_file.name.split('.')[-1]
-                                        safe_name = f"{user['first_name']}-{user['last_name']}".replace(' ', '-')
-                                        safe_doc_type = doc_type.replace(' ', '-').replace('/', '-')
-                                        
-                                        filename = f"{user['citizen_id']}_{safe_name}_{safe_doc_type}.{file_extension}"
-                                        file_path = os.path.join(UPLOAD_DIR, filename)
-                                        
-                                        # Check file size (200MB limit)
-                                        if uploaded_file.size > 200 * 1024 * 1024:
-                                            error_messages.append(f"{doc_type}: ไฟล์มีขนาดเกิน 200MB")
-                                            continue
-                                        
-                                        # Save file
-                                        with open(file_path, 'wb') as f:
-                                            f.write(uploaded_file.getbuffer())
-                                        
-                                        success_count += 1
-                                        
-                                        # Log upload
-                                        log_entry = f"{datetime.datetime.now().isoformat()} - File uploaded by {user['username']}: {filename}\n"
-                                        with open(os.path.join(LOG_DIR, 'user_changes.log'), 'a', encoding='utf-8') as f:
-                                            f.write(log_entry)
-                                        
-                                    except Exception as e:
-                                        error_messages.append(f"{doc_type}: {str(e)}")
+                                # Check file size (200MB limit) before any other work
+                                if uploaded_file.size > MAX_UPLOAD_SIZE:
+                                    error_messages.append(f"{doc_type}: ไฟล์มีขนาดเกิน 200MB")
+                                    continue
+                                
+                                # Generate filename according to convention
+                                file_extension = uploaded_file.name.rpartition('.')[2]
+                                safe_doc_type = doc_type.translate(FILENAME_SAFE_TABLE)
+                                
+                                filename = f"{user_file_prefix}{safe_doc_type}.{file_extension}"
+                                upload_jobs.append((doc_type, filename, uploaded_file))
+                            
+                            # Save files in parallel, reporting progress as each one lands
+                            save_progress = st.progress(0.0)
+                            save_errors = DataManager.save_uploads(
+                                [(uploaded_file, os.path.join(UPLOAD_DIR, filename)) for _, filename, uploaded_file in upload_jobs],
+                                on_progress=save_progress.progress
+                            )
+                            save_progress.empty()
+                            
+                            for (doc_type, filename, _), error in zip(upload_jobs, save_errors):
+                                if error is not None:
+                                    error_messages.append(f"{doc_type}: {str(error)}")
+                                    continue
+                                
+                                success_count += 1
+                                
+                                # Log upload
+                                upload_log_lines.append(f"{now_iso} - File uploaded by {user['username']}: {filename}\n")
+                            
+                            if upload_log_lines:
+                                LOG_WRITER.append(os.path.join(LOG_DIR, 'user_changes.log'), ''.join(upload_log_lines))
                             
                             # Show results
                             if success_count > 0:
@@ -3942,382 +4204,310 @@ else:
                 """, unsafe_allow_html=True)
                 
                 # List user's uploaded files
-                if os.path.exists(UPLOAD_DIR):
-                    user_files = []
-                    for filename in os.listdir(UPLOAD_DIR):
-                        if filename.startswith(user['citizen_id']):
-                            file_path = os.path.join(UPLOAD_DIR, filename)
-                            if os.path.isfile(file_path):
-                                stat = os.stat(file_path)
-                                user_files.append({
-                                    'filename': filename,
-                                    'path': file_path,
-                                    'size': stat.st_size,
-                                    'modified': stat.st_mtime
-                                })
+                file_stats = []
+                upload_index = index_uploads(os.stat(UPLOAD_DIR).st_mtime_ns)
+                for filename in upload_index.get(user['citizen_id'], []):
+                    file_path = os.path.join(UPLOAD_DIR, filename)
+                    try:
+                        stat = os.stat(file_path)
+                    except OSError:
+                        continue
+                    file_stats.append((stat.st_mtime, filename, file_path, stat.st_size))
+                # Newest first; tuples compare in C, and grouping below keeps this order
+                file_stats.sort(reverse=True)
+                user_files = [
+                    {'filename': filename, 'path': file_path, 'size': size, 'modified': mtime}
+                    for mtime, filename, file_path, size in file_stats
+                ]
+                
+                if user_files:
+                    # Documents Container with compact header
+                    st.markdown("""
+                    <div style="
+                        background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
+                        padding: 1.5rem;
+                        border-radius: 15px;
+                        border: 1px solid #dee2e6;
+                        margin-bottom: 1.5rem;
+                        box-shadow: 0 4px 15px rgba(0,0,0,0.06);
+                    ">
+                        <div style="text-align: center; margin-bottom: 1rem;">
+                            <div style="
+                                width: 50px;
+                                height: 50px;
+                                background: linear-gradient(135deg, #1e40af 0%, #1e3a8a 100%);
+                                border-radius: 50%;
+                                margin: 0 auto 0.5rem;
+                                display: flex;
+                                align-items: center;
+                                justify-content: center;
+                                font-size: 1.2rem;
+                                color: white;
+                                box-shadow: 0 2px 8px rgba(30, 64, 175, 0.2);
+                            ">📄</div>
+                            <h3 style="color: #1e40af; margin: 0 0 0.25rem 0; font-size: 1.2rem; font-weight: 600;">รายการเอกสารที่อัพโหลด</h3>
+                            <p style="color: #6c757d; margin: 0; font-size: 0.9rem;">จัดการและดูเอกสารของคุณ</p>
+                        </div>
                     
-                    if user_files:
-                        # Documents Container with compact header
-                        st.markdown("""
-                        <div style="
-                            background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
-                            padding: 1.5rem;
-                            border-radius: 15px;
-                            border: 1px solid #dee2e6;
-                            margin-bottom: 1.5rem;
-                            box-shadow: 0 4px 15px rgba(0,0,0,0.06);
-                        ">
-                            <div style="text-align: center; margin-bottom: 1rem;">
-                                <div style="
-                                    width: 50px;
-                                    height: 50px;
-                                    background: linear-gradient(135deg, #1e40af 0%, #1e3a8a 100%);
-                                    border-radius: 50%;
-                                    margin: 0 auto 0.5rem;
-                                    display: flex;
-                                    align-items: center;
-                                    justify-content: center;
-                                    font-size: 1.2rem;
-                                    color: white;
-                                    box-shadow: 0 2px 8px rgba(30, 64, 175, 0.2);
-                                ">📄</div>
-                                <h3 style="color: #1e40af; margin: 0 0 0.25rem 0; font-size: 1.2rem; font-weight: 600;">รายการเอกสารที่อัพโหลด</h3>
-                                <p style="color: #6c757d; margin: 0; font-size: 0.9rem;">จัดการและดูเอกสารของคุณ</p>
-                            </div>
-                        
-                    </div>
-                    """, unsafe_allow_html=True)
+                </div>
+                """, unsafe_allow_html=True)
+                
+                # Group files by document type
+                files_by_type = {}
+                for file_info in user_files:
+                    ext = os.path.splitext(file_info['filename'])[1].lower()
+                    # Parse document type from filename
+                    parts = file_info['filename'].split('_')
+                    doc_type = parts[2].split('.')[0] if len(parts) > 2 else 'ไม่ทราบ'
+                    doc_type = doc_type.replace('-', ' ')
                     
-                    # Group files by document type
-                    files_by_type = {}
-                    for file_info in user_files:
-                        # Parse document type from filename
-                        parts = file_info['filename'].split('_')
-                        doc_type = parts[2].split('.')[0] if len(parts) > 2 else 'ไม่ทราบ'
-                        doc_type = doc_type.replace('-', ' ')
-                        
-                        # Set appropriate icon based on document type
+                    # Set appropriate icon based on document type
+                    doc_icon = "DOC"
+                    if 'บัตรประชาชน' in doc_type or 'citizen' in doc_type.lower():
+                        doc_icon = "ID"
+                    elif 'ทะเบียนบ้าน' in doc_type or 'house' in doc_type.lower():
+                        doc_icon = "HOME"
+                    elif 'ประกาศนียบัตร' in doc_type or 'certificate' in doc_type.lower() or 'ใบรับรอง' in doc_type:
+                        doc_icon = "EDU"
+                    elif 'ใบสมัคร' in doc_type or 'application' in doc_type.lower():
                         doc_icon = "DOC"
-                        if 'บัตรประชาชน' in doc_type or 'citizen' in doc_type.lower():
-                            doc_icon = "ID"
-                        elif 'ทะเบียนบ้าน' in doc_type or 'house' in doc_type.lower():
-                            doc_icon = "HOME"
-                        elif 'ประกาศนียบัตร' in doc_type or 'certificate' in doc_type.lower() or 'ใบรับรอง' in doc_type:
-                            doc_icon = "EDU"
-                        elif 'ใบสมัคร' in doc_type or 'application' in doc_type.lower():
-                            doc_icon = "DOC"
-                        elif 'รูปถ่าย' in doc_type or 'photo' in doc_type.lower() or 'picture' in doc_type.lower():
-                            doc_icon = "IMG"
-                        elif 'transcript' in doc_type.lower() or 'ใบแสดงผลการเรียน' in doc_type:
-                            doc_icon = "XLS"
-                        
-                        if doc_type not in files_by_type:
-                            files_by_type[doc_type] = {'files': [], 'icon': doc_icon}
-                        files_by_type[doc_type]['files'].append(file_info)
+                    elif 'รูปถ่าย' in doc_type or 'photo' in doc_type.lower() or 'picture' in doc_type.lower():
+                        doc_icon = "IMG"
+                    elif 'transcript' in doc_type.lower() or 'ใบแสดงผลการเรียน' in doc_type:
+                        doc_icon = "XLS"
+                    
+                    if doc_type not in files_by_type:
+                        files_by_type[doc_type] = {'files': [], 'icon': doc_icon}
+                    files_by_type[doc_type]['files'].append(file_info)
+                
+                # Display files grouped by type
+                for doc_type, type_info in files_by_type.items():
+                    files = type_info['files']
+                    doc_icon = type_info['icon']
+                    
+                    # Document type header
+                    st.markdown(f"""
+                    <div style="
+                        background: linear-gradient(135deg, #1e40af 0%, #1e3a8a 100%);
+                        color: white;
+                        padding: 1rem 1.5rem;
+                        border-radius: 12px 12px 0 0;
+                        margin: 1.5rem 0 0 0;
+                        display: flex;
+                        align-items: center;
+                        gap: 0.75rem;
+                        font-weight: 600;
+                        box-shadow: 0 4px 15px rgba(30, 64, 175, 0.3);
+                    ">
+                        <span style="font-size: 1.5rem;">{doc_icon}</span>
+                        <span style="font-size: 1.1rem;">{doc_type}</span>
+                        <span style="
+                            background: rgba(255,255,255,0.2);
+                            padding: 0.25rem 0.75rem;
+                            border-radius: 20px;
+                            font-size: 0.85rem;
+                            margin-left: auto;
+                        ">{len(files)} ไฟล์</span>
+                    </div>
+                    """, unsafe_allow_html=True)
                     
-                    # Display files grouped by type
-                    for doc_type, type_info in files_by_type.items():
-                        files = sorted(type_info['files'], key=lambda x: x['modified'], reverse=True)
-                        doc_icon = type_info['icon']
+                    for i, file_info in enumerate(files):
+                        # Determine file extension and appropriate styling
+                        file_ext = file_info['filename'].rpartition('.')[2].lower()
+                        if file_ext in ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'webp']:
+                            file_type_icon = "IMG"
+                            file_type_color = "#10b981"
+                            file_type_name = "รูปภาพ"
+                        elif file_ext == 'pdf':
+                            file_type_icon = "PDF"
+                            file_type_color = "#ef4444"
+                            file_type_name = "PDF"
+                        elif file_ext in ['doc', 'docx']:
+                            file_type_icon = "DOC"
+                            file_type_color = "#2563eb"
+                            file_type_name = "Word"
+                        elif file_ext in ['xls', 'xlsx']:
+                            file_type_icon = "XLS"
+                            file_type_color = "#16a34a"
+                            file_type_name = "Excel"
+                        else:
+                            file_type_icon = "DOC"
+                            file_type_color = "#6b7280"
+                            file_type_name = "เอกสาร"
                         
-                        # Document type header
+                        # File card with enhanced design
+                        border_radius = "0 0 12px 12px" if i == len(files) - 1 else "0"
+                        modified_tm = time.localtime(file_info['modified'])
                         st.markdown(f"""
                         <div style="
-                            background: linear-gradient(135deg, #1e40af 0%, #1e3a8a 100%);
-                            color: white;
-                            padding: 1rem 1.5rem;
-                            border-radius: 12px 12px 0 0;
-                            margin: 1.5rem 0 0 0;
-                            display: flex;
-                            align-items: center;
-                            gap: 0.75rem;
-                            font-weight: 600;
-                            box-shadow: 0 4px 15px rgba(30, 64, 175, 0.3);
-                        ">
-                            <span style="font-size: 1.5rem;">{doc_icon}</span>
-                            <span style="font-size: 1.1rem;">{doc_type}</span>
-                            <span style="
-                                background: rgba(255,255,255,0.2);
-                                padding: 0.25rem 0.75rem;
-                                border-radius: 20px;
-                                font-size: 0.85rem;
-                                margin-left: auto;
-                            ">{len(files)} ไฟล์</span>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                        for i, file_info in enumerate(files):
-                            # Determine file extension and appropriate styling
-                            file_ext = file_info['filename'].split('.')[-1].lower()
-                            if file_ext in ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'webp']:
-                                file_type_icon = "IMG"
-                                file_type_color = "#10b981"
-                                file_type_name = "รูปภาพ"
-                            elif file_ext == 'pdf':
-                                file_type_icon = "PDF"
-                                file_type_color = "#ef4444"
-                                file_type_name = "PDF"
-                            elif file_ext in ['doc', 'docx']:
-                                file_type_icon = "DOC"
-                                file_type_color = "#2563eb"
-                                file_type_name = "Word"
-                            elif file_ext in ['xls', 'xlsx']:
-                                file_type_icon = "XLS"
-                                file_type_color = "#16a34a"
-                                file_type_name = "Excel"
-                            else:
-                                file_type_icon = "DOC"
-                                file_type_color = "#6b7280"
-                                file_type_name = "เอกสาร"
-                            
-                            # File card with enhanced design
-                            border_radius = "0 0 12px 12px" if i == len(files) - 1 else "0"
-                            st.markdown(f"""
-                            <div style="
-                                background: white;
-                                padding: 1.5rem;
-                                border: 1px solid #e5e7eb;
-                                border-top: none;
-                                border-radius: {border_radius};
-                                margin: 0;
-                                transition: all 0.3s ease;
-                                position: relative;
-                            " onmouseover="this.style.backgroundColor='#f8fafc'; this.style.transform='translateX(5px)';" onmouseout="this.style.backgroundColor='white'; this.style.transform='translateX(0)';">
-                                <div style="display: flex; align-items: center; justify-content: space-between;">
-                                    <div style="display: flex; align-items: center; flex: 1;">
-                                        <div style="
-                                            width: 60px;
-                                            height: 60px;
-                                            background: linear-gradient(135deg, {file_type_color} 0%, {file_type_color}dd 100%);
-                                            border-radius: 12px;
-                                            display: flex;
-                                            align-items: center;
-                                            justify-content: center;
-                                            margin-right: 1.5rem;
-                                            color: white;
-                                            font-size: 1.5rem;
-                                            box-shadow: 0 4px 12px rgba(0,0,0,0.15);
-                                        ">{file_type_icon}</div>
-                                        <div style="flex: 1;">
-                                            <h6 style="margin: 0 0 0.5rem 0; color: #1f2937; font-size: 1rem; font-weight: 600; line-height: 1.3;">{file_info['filename']}</h6>
-                                            <div style="display: flex; gap: 1.5rem; flex-wrap: wrap; margin-bottom: 0.5rem;">
-                                                <div style="display: flex; align-items: center; gap: 0.5rem;">
-                                                    <span style="color: #6b7280; font-size: 0.8rem;">FILE</span>
-                                                    <span style="color: #6b7280; font-size: 0.85rem;">{file_type_name}</span>
-                                                </div>
-                                                <div style="display: flex; align-items: center; gap: 0.5rem;">
-                                                    <span style="color: #6b7280; font-size: 0.8rem;">💾</span>
-                                                    <span style="color: #6b7280; font-size: 0.85rem;">{file_info['size']/1024:.1f} KB</span>
-                                                </div>
-                                                <div style="display: flex; align-items: center; gap: 0.5rem;">
-                                                    <span style="color: #6b7280; font-size: 0.8rem;">📅</span>
-                                                    <span style="color: #6b7280; font-size: 0.85rem;">{datetime.datetime.fromtimestamp(file_info['modified']).strftime('%d/%m/%Y')}</span>
-                                                </div>
-                                                <div style="display: flex; align-items: center; gap: 0.5rem;">
-                                                    <span style="color: #6b7280; font-size: 0.8rem;">🕒</span>
-                                                    <span style="color: #6b7280; font-size: 0.85rem;">{datetime.datetime.fromtimestamp(file_info['modified']).strftime('%H:%M น.')}</span>
-                                                </div>
+                            background: white;
+                            padding: 1.5rem;
+                            border: 1px solid #e5e7eb;
+                            border-top: none;
+                            border-radius: {border_radius};
+                            margin: 0;
+                            transition: all 0.3s ease;
+                            position: relative;
+                        " onmouseover="this.style.backgroundColor='#f8fafc'; this.style.transform='translateX(5px)';" onmouseout="this.style.backgroundColor='white'; this.style.transform='translateX(0)';">
+                            <div style="display: flex; align-items: center; justify-content: space-between;">
+                                <div style="display: flex; align-items: center; flex: 1;">
+                                    <div style="
+                                        width: 60px;
+                                        height: 60px;
+                                        background: linear-gradient(135deg, {file_type_color} 0%, {file_type_color}dd 100%);
+                                        border-radius: 12px;
+                                        display: flex;
+                                        align-items: center;
+                                        justify-content: center;
+                                        margin-right: 1.5rem;
+                                        color: white;
+                                        font-size: 1.5rem;
+                                        box-shadow: 0 4px 12px rgba(0,0,0,0.15);
+                                    ">{file_type_icon}</div>
+                                    <div style="flex: 1;">
+                                        <h6 style="margin: 0 0 0.5rem 0; color: #1f2937; font-size: 1rem; font-weight: 600; line-height: 1.3;">{file_info['filename']}</h6>
+                                        <div style="display: flex; gap: 1.5rem; flex-wrap: wrap; margin-bottom: 0.5rem;">
+                                            <div style="display: flex; align-items: center; gap: 0.5rem;">
+                                                <span style="color: #6b7280; font-size: 0.8rem;">FILE</span>
+                                                <span style="color: #6b7280; font-size: 0.85rem;">{file_type_name}</span>
+                                            </div>
+                                            <div style="display: flex; align-items: center; gap: 0.5rem;">
+                                                <span style="color: #6b7280; font-size: 0.8rem;">💾</span>
+                                                <span style="color: #6b7280; font-size: 0.85rem;">{file_info['size']/1024:.1f} KB</span>
+                                            </div>
+                                            <div style="display: flex; align-items: center; gap: 0.5rem;">
+                                                <span style="color: #6b7280; font-size: 0.8rem;">📅</span>
+                                                <span style="color: #6b7280; font-size: 0.85rem;">{time.strftime('%d/%m/%Y', modified_tm)}</span>
+                                            </div>
+                                            <div style="display: flex; align-items: center; gap: 0.5rem;">
+                                                <span style="color: #6b7280; font-size: 0.8rem;">🕒</span>
+                                                <span style="color: #6b7280; font-size: 0.85rem;">{time.strftime('%H:%M น.', modified_tm)}</span>
                                             </div>
                                         </div>
                                     </div>
                                 </div>
-                            """, unsafe_allow_html=True)
-                        
-                        # Action buttons integrated within the document card
-                        st.markdown("""
-                        <style>
-                        .doc-action-btn {
-                            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                            color: white;
-                            border: none;
-                            padding: 0.5rem 1rem;
-                            border-radius: 8px;
-                            font-size: 0.9rem;
-                            font-weight: 500;
-                            cursor: pointer;
-                            transition: all 0.3s ease;
-                            text-decoration: none;
-                            display: inline-block;
-                            margin: 0.2rem;
-                        }
-                        .doc-action-btn:hover {
-                            transform: translateY(-2px);
-                            box-shadow: 0 4px 12px rgba(102, 126, 234, 0.4);
-                        }
-                        .doc-preview-btn {
-                            background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);
-                        }
-                        .doc-download-btn {
-                            background: linear-gradient(135deg, #43e97b 0%, #38f9d7 100%);
-                        }
-                        .doc-edit-btn {
-                            background: linear-gradient(135deg, #fa709a 0%, #fee140 100%);
-                        }
-                        </style>
-                        """, unsafe_allow_html=True)
-                        
-                        # เพิ่ม CSS สำหรับปุ่มที่สวยงาม
-                        st.markdown("""
-                        <style>
-                        .user-action-buttons-container {
-                            display: flex;
-                            gap: 10px;
-                            align-items: center;
-                            justify-content: center;
-                            margin: 1rem 0;
-                            padding: 1rem;
-                            background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
-                            border-radius: 15px;
-                            border: 1px solid rgba(0,0,0,0.1);
-                            box-shadow: 0 4px 15px rgba(0,0,0,0.08);
-                        }
-                        .user-action-btn {
-                            flex: 1;
-                            min-height: 45px;
-                            border-radius: 10px;
-                            font-weight: 600;
-                            transition: all 0.3s ease;
-                            border: none;
-                            cursor: pointer;
-                            font-size: 0.95rem;
-                        }
-                        .user-action-btn:hover {
-                            transform: translateY(-3px);
-                            box-shadow: 0 6px 20px rgba(0,0,0,0.15);
-                        }
-                        </style>
+                            </div>
                         """, unsafe_allow_html=True)
+                    
+                    # จัดเรียงปุ่มทั้ง 3 ปุ่มในแถวเดียวกันแบบสวยงาม
+                    col1, col2, col3 = st.columns([1, 1, 1], gap="medium")
+                    
+                    # ปุ่มดูตัวอย่าง
+                    preview_active = st.session_state.get('preview_target') == file_info['filename']
+                    preview_button_text = "ปิด" if preview_active else "ดู"
+                    preview_button_type = "secondary" if preview_active else "primary"
+                    
+                    with col1:
+                        if st.button(preview_button_text, key=f"preview_{file_info['filename']}", help="คลิกเพื่อดูตัวอย่างเอกสาร", type=preview_button_type, use_container_width=True):
+                            # Only one document is previewed at a time
+                            st.session_state.preview_target = None if preview_active else file_info['filename']
+                            st.rerun()
+                    
+                    with col2:
+                        # Download button with enhanced styling and feedback
+                        try:
+                            file_size = file_info['size'] / (1024 * 1024)  # Size in MB
+                            
+                            download_file_button(
+                                file_info['path'],
+                                file_info['filename'],
+                                key=f"download_{file_info['filename']}",
+                                help_text=f"คลิกเพื่อดาวน์โหลดเอกสาร {file_info['filename']} (ขนาด {file_size:.1f} MB)"
+                            )
+                        except Exception as e:
+                            st.error(f"ไม่สามารถเตรียมไฟล์สำหรับดาวน์โหลดได้: {str(e)}")
+                    
+                    with col3:
+                        # Delete button
+                        if st.button("ลบ", key=f"delete_{file_info['filename']}", help="คลิกเพื่อลบเอกสารนี้", use_container_width=True, type="secondary"):
+                            st.session_state[f"confirm_delete_{file_info['filename']}"] = True
+                            st.rerun()
                         
-                        # จัดเรียงปุ่มทั้ง 3 ปุ่มในแถวเดียวกันแบบสวยงาม
-                        col1, col2, col3 = st.columns([1, 1, 1], gap="medium")
-                        
-                        # ปุ่มดูตัวอย่าง
-                        preview_active = st.session_state.get(f"show_preview_{file_info['filename']}", False)
-                        preview_button_text = "ปิด" if preview_active else "ดู"
-                        preview_button_type = "secondary" if preview_active else "primary"
-                        
-                        with col1:
-                            if st.button(preview_button_text, key=f"preview_{file_info['filename']}", help="คลิกเพื่อดูตัวอย่างเอกสาร", type=preview_button_type, use_container_width=True):
-                                # Clear other preview and edit states for better UX
-                                for key in list(st.session_state.keys()):
-                                    if key.startswith("show_preview_") and key != f"show_preview_{file_info['filename']}":
-                                        st.session_state[key] = False
-                                st.session_state[f"show_preview_{file_info['filename']}"] = not preview_active
-                                st.rerun()
-                        
-                        with col2:
-                            # Download button with enhanced styling and feedback
-                            try:
-                                with open(file_info['path'], 'rb') as f:
-                                    file_data = f.read()
-                                    file_size = len(file_data) / (1024 * 1024)  # Size in MB
-                                    
-                                    st.download_button(
-                                        "ดาวน์โหลด",
-                                        file_data,
-                                        file_name=file_info['filename'],
-                                        key=f"download_{file_info['filename']}",
-                                        help=f"คลิกเพื่อดาวน์โหลดเอกสาร {file_info['filename']} (ขนาด {file_size:.1f} MB)",
-                                        use_container_width=True,
-                                        type="primary"
-                                    )
-                            except Exception as e:
-                                st.error(f"ไม่สามารถเตรียมไฟล์สำหรับดาวน์โหลดได้: {str(e)}")
-                        
-                        with col3:
-                            # Delete button
-                            if st.button("ลบ", key=f"delete_{file_info['filename']}", help="คลิกเพื่อลบเอกสารนี้", use_container_width=True, type="secondary"):
-                                st.session_state[f"confirm_delete_{file_info['filename']}"] = True
-                                st.rerun()
+                        # Delete confirmation dialog
+                        if st.session_state.get(f"confirm_delete_{file_info['filename']}", False):
+                            st.markdown("""
+                            <div style="
+                                background: linear-gradient(135deg, #fee2e2 0%, #fecaca 100%);
+                                padding: 1rem;
+                                border-radius: 10px;
+                                border: 1px solid rgba(239, 68, 68, 0.3);
+                                margin: 0.5rem 0;
+                            ">
+                                <p style="color: #dc2626; margin: 0; font-size: 0.9rem; text-align: center;">คุณแน่ใจหรือไม่ที่จะลบเอกสารนี้?</p>
+                            </div>
+                            """, unsafe_allow_html=True)
                             
-                            # Delete confirmation dialog
-                            if st.session_state.get(f"confirm_delete_{file_info['filename']}", False):
-                                st.markdown("""
-                                <div style="
-                                    background: linear-gradient(135deg, #fee2e2 0%, #fecaca 100%);
-                                    padding: 1rem;
-                                    border-radius: 10px;
-                                    border: 1px solid rgba(239, 68, 68, 0.3);
-                                    margin: 0.5rem 0;
-                                ">
-                                    <p style="color: #dc2626; margin: 0; font-size: 0.9rem; text-align: center;">คุณแน่ใจหรือไม่ที่จะลบเอกสารนี้?</p>
-                                </div>
-                                """, unsafe_allow_html=True)
-                                
-                                col_confirm, col_cancel = st.columns(2)
-                                with col_confirm:
-                                    if st.button("ยืนยันลบ", key=f"confirm_delete_yes_{file_info['filename']}", use_container_width=True, type="primary"):
-                                        try:
-                                            os.remove(file_info['path'])
-                                            st.session_state[f"confirm_delete_{file_info['filename']}"] = False
-                                            st.success(f"ลบเอกสาร {file_info['filename']} เรียบร้อยแล้ว")
-                                            st.rerun()
-                                        except Exception as e:
-                                            st.error(f"เกิดข้อผิดพลาดในการลบเอกสาร: {str(e)}")
-                                
-                                with col_cancel:
-                                    if st.button("ยกเลิก", key=f"confirm_delete_no_{file_info['filename']}", use_container_width=True):
+                            col_confirm, col_cancel = st.columns(2)
+                            with col_confirm:
+                                if st.button("ยืนยันลบ", key=f"confirm_delete_yes_{file_info['filename']}", use_container_width=True, type="primary"):
+                                    try:
+                                        os.remove(file_info['path'])
                                         st.session_state[f"confirm_delete_{file_info['filename']}"] = False
+                                        st.success(f"ลบเอกสาร {file_info['filename']} เรียบร้อยแล้ว")
                                         st.rerun()
-                        
-                        # Show preview if requested - moved outside columns for proper display
-                        if st.session_state.get(f"show_preview_{file_info['filename']}", False):
-                            if file_info['filename'].lower().endswith(('.png', '.jpg', '.jpeg', '.gif')):
-                                # Add padding and styling for image display
-                                st.markdown("""
-                                <div style="
-                                    background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
-                                    border-radius: 20px;
-                                    margin: 1rem 0;
-                                    padding: 1rem;
-                                    box-shadow: 0 10px 30px rgba(0,0,0,0.1);
-                                ">
-                                """, unsafe_allow_html=True)
-                                
-                                # Center the image using columns with more space
-                                col1, col2, col3 = st.columns([0.5, 3, 0.5])
-                                with col2:
-                                    st.image(file_info['path'], caption=file_info['filename'], use_container_width=True)
-                                
-                                st.markdown("</div>", unsafe_allow_html=True)
-                            elif file_info['filename'].lower().endswith('.pdf'):
-                                # Center the PDF display using columns with more space (same as image)
-                                col1, col2, col3 = st.columns([0.5, 3, 0.5])
-                                with col2:
-                                    # Display PDF using iframe with base64 encoding
-                                    try:
-                                        import base64
-                                        with open(file_info['path'], "rb") as f:
-                                            pdf_data = f.read()
-                                        pdf_base64 = base64.b64encode(pdf_data).decode('utf-8')
-                                        
-                                        # Display PDF in iframe without padding
-                                        st.markdown(f"""
-                                        <iframe src="data:application/pdf;base64,{pdf_base64}" 
-                                                width="100%" 
-                                                height="600" 
-                                                style="border: none; border-radius: 10px;">
-                                        </iframe>
-                                        """, unsafe_allow_html=True)
                                     except Exception as e:
-                                        # Fallback with styled preview card (same as image style)
-                                        st.markdown(f"""
-                                        <div style="
-                                            background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
-                                            border-radius: 20px;
-                                            text-align: center;
-                                            padding: 2rem;
-                                            box-shadow: 0 10px 30px rgba(0,0,0,0.1);
-                                            border: 1px solid rgba(0,0,0,0.1);
-                                        ">
-                                            <div style="font-size: 3rem; margin-bottom: 1rem;"></div>
-                                            <h4 style="color: #495057; margin: 0 0 1rem 0; font-size: 1.3rem; font-weight: 600;">{file_info['filename']}</h4>
-                                            <p style="color: #6c757d; margin: 0; font-size: 1rem;">PDF Document</p>
-                                            </div>
-                                            """, unsafe_allow_html=True)
-                    else:
-                        # st.info("ไม่มีเอกสารที่อัพโหลด")
-                        pass
+                                        st.error(f"เกิดข้อผิดพลาดในการลบเอกสาร: {str(e)}")
+                            
+                            with col_cancel:
+                                if st.button("ยกเลิก", key=f"confirm_delete_no_{file_info['filename']}", use_container_width=True):
+                                    st.session_state[f"confirm_delete_{file_info['filename']}"] = False
+                                    st.rerun()
+                    
+                    # Show preview if requested - moved outside columns for proper display
+                    if preview_active:
+                        if ext in IMG_EXTS:
+                            # Add padding and styling for image display
+                            st.markdown("""
+                            <div style="
+                                background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
+                                border-radius: 20px;
+                                margin: 1rem 0;
+                                padding: 1rem;
+                                box-shadow: 0 10px 30px rgba(0,0,0,0.1);
+                            ">
+                            """, unsafe_allow_html=True)
+                            
+                            # Center the image using columns with more space
+                            col1, col2, col3 = st.columns([0.5, 3, 0.5])
+                            with col2:
+                                st.image(image_preview(file_info['path'], file_info['modified']), caption=file_info['filename'], use_container_width=True)
+                            
+                            st.markdown("</div>", unsafe_allow_html=True)
+                        elif ext == '.pdf':
+                            # Center the PDF display using columns with more space (same as image)
+                            col1, col2, col3 = st.columns([0.5, 3, 0.5])
+                            with col2:
+                                # Display PDF using iframe with base64 encoding
+                                try:
+                                    import base64
+                                    with open(file_info['path'], "rb") as f:
+                                        pdf_data = f.read()
+                                    pdf_base64 = base64.b64encode(pdf_data).decode('utf-8')
+                                    
+                                    # Display PDF in iframe without padding
+                                    st.markdown(f"""
+                                    <iframe src="data:application/pdf;base64,{pdf_base64}" 
+                                            width="100%" 
+                                            height="600" 
+                                            style="border: none; border-radius: 10px;">
+                                    </iframe>
+                                    """, unsafe_allow_html=True)
+                                except Exception as e:
+                                    # Fallback with styled preview card (same as image style)
+                                    st.markdown(f"""
+                                    <div style="
+                                        background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
+                                        border-radius: 20px;
+                                        text-align: center;
+                                        padding: 2rem;
+                                        box-shadow: 0 10px 30px rgba(0,0,0,0.1);
+                                        border: 1px solid rgba(0,0,0,0.1);
+                                    ">
+                                        <div style="font-size: 3rem; margin-bottom: 1rem;"></div>
+                                        <h4 style="color: #495057; margin: 0 0 1rem 0; font-size: 1.3rem; font-weight: 600;">{file_info['filename']}</h4>
+                                        <p style="color: #6c757d; margin: 0; font-size: 1rem;">PDF Document</p>
+                                        </div>
+                                        """, unsafe_allow_html=True)
                 else:
                     # st.info("ไม่มีเอกสารที่อัพโหลด")
                     pass
@@ -4631,8 +4821,8 @@ else:
                                 new_gpax = st.text_input("เกรดเฉลี่ย", value=gpax_formatted)
                                 new_graduation_year = st.selectbox(
                                     "ปีที่จบการศึกษา",
-                                    options=list(range(2020, 2030)),
-                                    index=list(range(2020, 2030)).index(user.get('graduation_year', 2024))
+                                    options=GRAD_YEARS,
+                                    index=GRAD_YEARS.index(user.get('graduation_year', 2024))
                                 )
 
                             
@@ -4656,12 +4846,9 @@ else:
                             
                             # Set default index for province selectbox
                             current_province = user.get('province', '')
-                            province_options = [""] + THAI_PROVINCES
-                            province_index = 0
-                            if current_province and current_province in THAI_PROVINCES:
-                                province_index = province_options.index(current_province)
+                            province_index = PROVINCE_OPTION_INDEX.get(current_province, 0)
                             
-                            new_province = st.selectbox("จังหวัด", options=province_options, index=province_index)
+                            new_province = st.selectbox("จังหวัด", options=PROVINCE_OPTIONS, index=province_index)
                             
                             col_e, col_f = st.columns(2)
                             with col_e:
@@ -4690,9 +4877,9 @@ else:
                             
                             col_g, col_h = st.columns(2)
                             with col_g:
-                                new_password = st.text_input("รหัสผ่านใหม่", type="password")
+                                new_password = st.text_input("รหัสผ่านใหม่", type="password", max_chars=MAX_PASSWORD_BYTES)
                             with col_h:
-                                confirm_new_password = st.text_input("ยืนยันรหัสผ่านใหม่", type="password")
+                                confirm_new_password = st.text_input("ยืนยันรหัสผ่านใหม่", type="password", max_chars=MAX_PASSWORD_BYTES)
                             
                             submit_edit = st.form_submit_button("💾 บันทึกการเปลี่ยนแปลง", use_container_width=True)
                             
@@ -4706,46 +4893,47 @@ else:
                                 
                                 # Validate formats
                                 if not errors:
-                                    validations = [
-                                        Validator.validate_thai_name(new_first_name),
-                                        Validator.validate_thai_name(new_last_name),
-                                        Validator.validate_email(new_email),
-                                        Validator.validate_phone(new_phone),
-                                        Validator.validate_gpax(new_gpax)
-                                    ]
-                                    
                                     # Validate citizen ID - check uniqueness only if changed
                                     if new_citizen_id != user.get('citizen_id'):
-                                        is_valid, error_msg = Validator.validate_citizen_id_with_uniqueness(new_citizen_id, user.get('username'))
-                                        if not is_valid:
-                                            validations.append((is_valid, error_msg))
+                                        citizen_check = lambda cid: Validator.validate_citizen_id_with_uniqueness(cid, user.get('username'))
                                     else:
                                         # Just validate format if not changed
-                                        is_valid, error_msg = Validator.validate_citizen_id(new_citizen_id)
+                                        citizen_check = Validator.validate_citizen_id
+                                    
+                                    # Stop at the first failing check; the uniqueness lookup runs last
+                                    validations = (
+                                        (Validator.validate_thai_name, new_first_name),
+                                        (Validator.validate_thai_name, new_last_name),
+                                        (Validator.validate_email, new_email),
+                                        (Validator.validate_phone, new_phone),
+                                        (Validator.validate_gpax, new_gpax),
+                                        (citizen_check, new_citizen_id)
+                                    )
+                                    for validator, value in validations:
+                                        is_valid, error_msg = validator(value)
                                         if not is_valid:
-                                            validations.append((is_valid, error_msg))
+                                            errors.append(error_msg)
+                                            break
                                     
                                     # Validate parent phone if provided
-                                    if new_parent_phone and new_parent_phone.strip():
+                                    if not errors and new_parent_phone and new_parent_phone.strip():
                                         is_valid, error_msg = Validator.validate_phone(new_parent_phone)
                                         if not is_valid:
                                             errors.append(f"เบอร์ผู้ปกครอง: {error_msg}")
-                                    
-                                    for is_valid, error_msg in validations:
-                                        if not is_valid:
-                                            errors.append(error_msg)
                                 
                                 # Password validation
                                 if new_password:
                                     # Check if old password is provided and correct
                                     if not old_password:
                                         errors.append("กรุณากรอกรหัสผ่านเดิมเพื่อยืนยันตัวตน")
-                                    elif AuthManager.hash_password(old_password) != user.get('password'):
+                                    elif not AuthManager.verify_password(old_password, user.get('password', '')):
                                         errors.append("รหัสผ่านเดิมไม่ถูกต้อง")
                                     elif new_password != confirm_new_password:
                                         errors.append("รหัสผ่านใหม่ไม่ตรงกัน")
                                     elif len(new_password) < 6:
                                         errors.append("รหัสผ่านต้องมีอย่างน้อย 6 ตัวอักษร")
+                                    elif AuthManager.password_too_long(new_password):
+                                        errors.append(PASSWORD_TOO_LONG_MSG)
                                     elif old_password == new_password:
                                         errors.append("รหัสผ่านใหม่ต้องแตกต่างจากรหัสผ่านเดิม")
                                 
@@ -4763,7 +4951,7 @@ else:
                                         'email': new_email,
                                         'school_name': new_school_name,
                                         'major': new_major,
-                                        'gpax': round(float(new_gpax), 2),
+                                        'gpax': Validator.parse_gpax(new_gpax),
                                         'graduation_year': new_graduation_year,
                                         'address': new_address,
                                         'province': new_province,